@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Замер запуска окна: python -m benchmarks.startup [--runs 5] [--rows N]
+#
+# Каждый запуск — отдельный процесс, который повторяет main.py и
+# записывает три момента от своего старта:
+#   import      — загружены PySide6 и модули окна;
+#   first_paint — окно впервые отрисовано;
+#   table       — таблица операций отрисована со строками.
+#
+# База создается заново с фиксированным seed, поэтому результаты разных
+# версий сравнимы между собой (--json сохраняет их в файл). Окно
+# работает на платформе offscreen, если не задана QT_QPA_PLATFORM.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = 50000
+RUNS = 5
+HISTORY_DAYS = 3 * 365
+TIMEOUT = 60
+METRICS = ['import', 'first_paint', 'table']
+
+
+def create_database(path: str, rows: int) -> None:
+    """Создает базу с rows операциями за последние три года."""
+    sys.path.insert(0, ROOT)
+    from src.core.database import SqliteDatabase
+    from src.core.ledger import Ledger
+
+    ledger = Ledger(SqliteDatabase(path))
+    if not ledger.initialize_database():
+        raise SystemExit('Не удалось создать базу для замера.')
+    category_ids = [
+        category_id for category_id, in ledger.database.iterate(
+            'SELECT ID FROM categories'
+        )
+    ]
+    generator = random.Random(0)
+    start = datetime.now() - timedelta(days=HISTORY_DAYS)
+    with ledger.database.transaction():
+        for _ in range(rows):
+            date = start + timedelta(
+                minutes=generator.randrange(HISTORY_DAYS * 24 * 60)
+            )
+            ledger.database.execute(
+                'INSERT INTO finances (Date, CategoryID, Description, '
+                'Balance) VALUES (?, ?, ?, ?)',
+                [
+                    date.strftime('%Y-%m-%d %H:%M'),
+                    generator.choice(category_ids), '',
+                    generator.randint(-500000, 300000)
+                ]
+            )
+    ledger.close()
+
+
+def run_window(database: str) -> dict:
+    """Запускает окно, как main.py, и возвращает моменты запуска в мс."""
+    started = time.perf_counter()
+    marks = {}
+
+    def mark(name: str) -> None:
+        marks.setdefault(name, (time.perf_counter() - started) * 1000)
+
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from src.main_window.main_window_controller import MainWindowController
+    from src.main_window.main_window_handler import MainWindowHandler
+    from src.main_window.main_window_view import MainWindowView
+    mark('import')
+
+    class PaintProbe(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and watched.isWidgetType():
+                if watched.window() is view:
+                    mark('first_paint')
+                table = view.table_container
+                if (
+                    watched is table.viewport() and table.model()
+                    and table.model().rowCount()
+                ):
+                    mark('table')
+                    QTimer.singleShot(0, app.quit)
+            return False
+
+    MainWindowHandler.DATABASE_NAME = database
+    app = QApplication(sys.argv[:1])
+    probe = PaintProbe()
+    app.installEventFilter(probe)
+    view = MainWindowView()
+    if sys.platform == 'win32':
+        view.set_icon(app)
+    handler = MainWindowHandler()
+    controller = MainWindowController(view, handler)
+    view.show()
+    QTimer.singleShot(TIMEOUT * 1000, app.quit)
+    app.exec()
+    del controller
+    return marks
+
+
+def measure(database: str, runs: int) -> list:
+    """Запускает окно runs раз, каждый раз в новом процессе."""
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [
+                sys.executable, '-m', 'benchmarks.startup',
+                '--window', database
+            ],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.startup',
+        description='Замер времени запуска окна FinanceFlow.'
+    )
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--rows', type=int, default=ROWS)
+    parser.add_argument('--json', metavar='ФАЙЛ', help='сохранить замеры')
+    parser.add_argument('--window', metavar='БАЗА', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.window:
+        print(json.dumps(run_window(args.window)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'finance_db.db')
+        create_database(database, args.rows)
+        results = measure(database, args.runs)
+
+    print(f'Операций: {args.rows}, запусков: {args.runs}')
+    print(f'{"":12} {"медиана":>9} {"мин":>9} {"макс":>9}')
+    summary = {}
+    for metric in METRICS:
+        values = [result.get(metric) for result in results]
+        if None in values:
+            print(f'{metric:12} не достигнуто')
+            continue
+        summary[metric] = statistics.median(values)
+        print(
+            f'{metric:12} {summary[metric]:9.1f} {min(values):9.1f} '
+            f'{max(values):9.1f}  мс'
+        )
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(
+                {'rows': args.rows, 'median': summary, 'runs': results},
+                file, ensure_ascii=False, indent=2
+            )
+
+
+if __name__ == '__main__':
+    main()
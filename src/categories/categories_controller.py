@@ -94,6 +94,16 @@ class CategoriesController(QObject):
             category_name = (
                 self.view.table_container.item(selected_row, 0).text()
             )
+            operations_count = self.handler.get_operations_count(
+                category_name
+            )
+            if operations_count > 0 and not self.view.show_question(
+                f'Категория "{category_name}" используется в '
+                f'{operations_count} операциях. При удалении категории '
+                'эти операции будут перемещены в категорию "Другое". '
+                'Продолжить?'
+            ):
+                return
             if self.handler.delete_category(category_name):
                 self.view.table_container.removeRow(selected_row)
                 self.category_deleted.emit(category_name)
@@ -43,6 +43,17 @@ class CategoriesView(QDialog, Ui_Dialog):
         """Показывает сообщение об ошибке."""
         QMessageBox.warning(self, 'Ошибка', message)
 
+    def show_question(self, message: str) -> bool:
+        """Показывает диалог с вопросом и кнопками Да/Нет."""
+        reply = QMessageBox.question(
+            self,
+            'Подтверждение',
+            message,
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        return reply == QMessageBox.Yes
+
     def get_category_name(self) -> str:
         """Возвращает текст из поля ввода."""
         return self.category_name_te.toPlainText().strip()
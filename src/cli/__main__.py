@@ -0,0 +1,8 @@
+import sys
+
+from src.cli.commands import main
+
+# Проверка нужна процессам разбора выписок: они запускаются методом
+# spawn и заново импортируют этот модуль.
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from src.core.database import SqliteDatabase
+from src.core.ledger import Ledger
+from src.core.money import format_amount
+from src.core.periods import PERIODS, parse_date
+from src.core.repositories import CategoryRepository, OperationRepository
+from src.imports.import_parsers import DateParser, parse_amount
+
+# Командная строка: python -m src.cli <команда>. Работает через Ledger и
+# sqlite3, без Qt, поэтому подходит для скриптов и машин без экрана.
+#
+# Модули импорта и экспорта загружают multiprocessing, XML и ZIP, поэтому
+# они импортируются только в своих командах: add, list и stats
+# запускаются без них.
+
+LIST_LIMIT = 50
+TOP_CATEGORIES = 7
+
+
+class CommandError(Exception):
+    """Команду нельзя выполнить с такими аргументами."""
+
+
+def _parse_day(value: str) -> str:
+    """Читает дату аргумента ('DD.MM.YYYY' или 'YYYY-MM-DD', можно со
+    временем 'HH:MM') в формате столбца Date.
+
+    Дата проверяется по календарю: '2026-02-30' — ошибка аргумента,
+    а не исключение при записи операции.
+    """
+    date = DateParser()(value)
+    try:
+        datetime.strptime(date or '', '%Y-%m-%d %H:%M')
+    except ValueError:
+        raise CommandError(f'Некорректная дата: {value}')
+    return date
+
+
+def _date_range(args):
+    """Возвращает период из --period или --from/--to для set_period.
+
+    Без --from или --to период открыт с этой стороны: границей
+    становится первый или последний день календаря datetime.
+    """
+    if args.date_from or args.date_to:
+        start = _parse_day(args.date_from or '0001-01-01')
+        end = _parse_day(args.date_to or '9999-12-31')
+        return parse_date(start), parse_date(end)
+    return args.period
+
+
+def _add_period_arguments(parser, default: str) -> None:
+    parser.add_argument(
+        '--period', choices=PERIODS, default=default,
+        help=f'период (по умолчанию {default})'
+    )
+    parser.add_argument(
+        '--from', dest='date_from', metavar='ДАТА',
+        help='начало периода вместо --period'
+    )
+    parser.add_argument(
+        '--to', dest='date_to', metavar='ДАТА',
+        help='конец периода вместо --period'
+    )
+    parser.add_argument(
+        '--start-day', type=int, metavar='ДЕНЬ',
+        help='день начала финансового месяца (по умолчанию — из базы)'
+    )
+
+
+def _select_period(ledger: Ledger, args) -> None:
+    start_day = args.start_day or ledger.rollup_start_day or 1
+    ledger.set_period(_date_range(args), start_day)
+
+
+def add_operation(ledger: Ledger, args) -> int:
+    if not CategoryRepository(ledger).category_exists(args.category):
+        raise CommandError(f'Нет категории: {args.category}')
+    try:
+        balance = parse_amount(args.amount)
+    except ValueError:
+        raise CommandError(f'Некорректная сумма: {args.amount}')
+    if not OperationRepository(ledger).add_operation(
+        _parse_day(args.date), args.category, args.description, balance
+    ):
+        return 1
+    return 0
+
+
+def list_operations(ledger: Ledger, args) -> int:
+    _select_period(ledger, args)
+    operations = OperationRepository(ledger).find_operations(
+        ledger.date_range, args.category, args.text, args.limit or None
+    )
+    if args.json:
+        print(json.dumps(operations, ensure_ascii=False, indent=2))
+        return 0
+    for operation in operations:
+        print('\t'.join([
+            str(operation['id']), operation['date'],
+            operation['category'] or '', format_amount(operation['balance']),
+            operation['description'] or ''
+        ]))
+    return 0
+
+
+def show_statistics(ledger: Ledger, args) -> int:
+    _select_period(ledger, args)
+    ledger.load_statistics()
+    statistics = ledger.get_category_statistics_detailed(args.top)
+    if args.json:
+        print(json.dumps(statistics, ensure_ascii=False, indent=2))
+        return 0
+    for kind, title in [('income', 'Доходы'), ('outcome', 'Расходы')]:
+        group = statistics[kind]
+        print(f'{title}: {format_amount(group["total"])}')
+        for name, item in group['categories'].items():
+            print(
+                f'  {name:<20} {format_amount(item["sum"]):>12}'
+                f' {item["share"]:6.1f}%'
+            )
+    return 0
+
+
+def show_months(ledger: Ledger, args) -> int:
+    months = [
+        {'month': month, 'income': income, 'outcome': outcome}
+        for month, income, outcome in ledger.fetch_monthly_totals()
+    ]
+    if args.json:
+        print(json.dumps(months, ensure_ascii=False, indent=2))
+        return 0
+    for month in months:
+        print(
+            f'{month["month"]}  {format_amount(month["income"]):>12}'
+            f' {format_amount(month["outcome"]):>12}'
+            f' {format_amount(month["income"] + month["outcome"]):>12}'
+        )
+    return 0
+
+
+def import_statements(ledger: Ledger, args) -> int:
+    from src.imports.import_handler import ImportHandler
+    from src.imports.import_parsers import ImportFormatError
+
+    mapping = {}
+    for column in args.column:
+        field, _, name = column.partition('=')
+        if not name:
+            raise CommandError(f'Ожидается ПОЛЕ=СТОЛБЕЦ: {column}')
+        mapping[field.strip()] = name
+    try:
+        result = ImportHandler(ledger).import_files(
+            args.files, mapping or None, workers=args.workers
+        )
+    except (ImportFormatError, OSError) as error:
+        raise CommandError(f'Ошибка импорта: {error}')
+    print('Импортировано операций:', result['imported'])
+    print('Уже были импортированы:', result['duplicates'])
+    for name, number in result['skipped']:
+        print(f'Пропущена запись №{number} в {name}', file=sys.stderr)
+    return 0
+
+
+def export_operations(ledger: Ledger, args) -> int:
+    from src.export.export_handler import ExportHandler
+
+    _select_period(ledger, args)
+    try:
+        count = ExportHandler(ledger).export(
+            args.path, ledger.date_range, args.category
+        )
+    except (OSError, ValueError) as error:
+        raise CommandError(f'Ошибка экспорта: {error}')
+    print('Экспортировано операций:', count)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli',
+        description='Учет операций FinanceFlow без графического интерфейса.'
+    )
+    parser.add_argument(
+        '--database', default=Ledger.DATABASE_NAME, metavar='ФАЙЛ',
+        help=f'файл базы (по умолчанию {Ledger.DATABASE_NAME})'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help='добавить операцию')
+    add.add_argument('date', help="дата: '31.12.2025 18:30' или '2025-12-31'")
+    add.add_argument(
+        'amount', help="сумма в рублях, расход со знаком минус: '-1500.50'"
+    )
+    add.add_argument('category', help='название категории')
+    add.add_argument('description', nargs='?', default='', help='описание')
+    add.set_defaults(run=add_operation)
+
+    list_parser = commands.add_parser('list', help='показать операции')
+    _add_period_arguments(list_parser, 'all')
+    list_parser.add_argument('--category', help='только эта категория')
+    list_parser.add_argument('--text', help='текст в описании')
+    list_parser.add_argument(
+        '--limit', type=int, default=LIST_LIMIT,
+        help=f'сколько последних операций (по умолчанию {LIST_LIMIT}, '
+             '0 — все)'
+    )
+    list_parser.add_argument(
+        '--json', action='store_true', help='в JSON, суммы в копейках'
+    )
+    list_parser.set_defaults(run=list_operations)
+
+    stats = commands.add_parser('stats', help='статистика по категориям')
+    _add_period_arguments(stats, 'current_month')
+    stats.add_argument(
+        '--top', type=int, default=TOP_CATEGORIES,
+        help='сколько категорий показывать отдельно'
+    )
+    stats.add_argument(
+        '--json', action='store_true', help='в JSON, суммы в копейках'
+    )
+    stats.set_defaults(run=show_statistics)
+
+    months = commands.add_parser(
+        'months',
+        help='доходы, расходы и итог по финансовым месяцам всей истории'
+    )
+    months.add_argument(
+        '--json', action='store_true', help='в JSON, суммы в копейках'
+    )
+    months.set_defaults(run=show_months)
+
+    import_parser = commands.add_parser('import', help='импорт выписок')
+    import_parser.add_argument('files', nargs='+', metavar='ФАЙЛ')
+    import_parser.add_argument(
+        '--column', action='append', default=[], metavar='ПОЛЕ=СТОЛБЕЦ',
+        help='столбец CSV для поля date, amount, category или description'
+    )
+    import_parser.add_argument(
+        '--workers', type=int, help='число процессов разбора'
+    )
+    import_parser.set_defaults(run=import_statements)
+
+    export = commands.add_parser('export', help='экспорт в CSV или XLSX')
+    export.add_argument('path', metavar='ФАЙЛ')
+    _add_period_arguments(export, 'all')
+    export.add_argument('--category', help='только эта категория')
+    export.set_defaults(run=export_operations)
+    return parser
+
+
+def main(argv=None) -> int:
+    """Выполняет команду и возвращает код завершения процесса."""
+    args = build_parser().parse_args(argv)
+    ledger = Ledger(SqliteDatabase(args.database))
+    if not ledger.initialize_database():
+        print('Не удалось открыть базу данных:', args.database,
+              file=sys.stderr)
+        return 1
+    try:
+        return args.run(ledger, args)
+    except CommandError as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        ledger.close()
@@ -0,0 +1,44 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Словарь ограниченного размера, вытесняющий давно не использованное.
+
+    on_evict вызывается для каждого значения, удаленного из кэша
+    (при вытеснении или очистке).
+    """
+
+    def __init__(self, maxsize: int, on_evict=None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.items = OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key, default=None):
+        """Возвращает значение и отмечает его как недавно использованное."""
+        if key not in self.items:
+            return default
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value) -> None:
+        """Сохраняет значение, вытесняя самое старое при переполнении."""
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.maxsize:
+            _, evicted = self.items.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(evicted)
+
+    def clear(self) -> None:
+        """Удаляет все значения."""
+        values = list(self.items.values())
+        self.items.clear()
+        if self.on_evict:
+            for value in values:
+                self.on_evict(value)
@@ -0,0 +1,145 @@
+import sqlite3
+from contextlib import contextmanager
+
+# Доступ ядра к базе данных. Ядро работает с базой только через методы
+# Database, поэтому не зависит от Qt: SqliteDatabase реализует их на
+# стандартном sqlite3 (скрипты, командная строка), а окна используют
+# QtDatabase из src/database/qt_database.py поверх соединения QtSql.
+#
+# Строки результата — кортежи значений в порядке столбцов запроса.
+
+
+class DatabaseError(Exception):
+    """Запрос к базе данных завершился ошибкой."""
+
+
+class Database:
+    """Соединение с базой данных, через которое работает ядро."""
+
+    # Путь к файлу базы; рядом с ним ищется finance_tracker.ini.
+    path = None
+
+    def open(self) -> bool:
+        """Открывает соединение. Возвращает False при ошибке."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Закрывает соединение."""
+        raise NotImplementedError
+
+    def execute(self, sql: str, params=()) -> int:
+        """Выполняет запрос и возвращает число измененных строк.
+
+        :raises DatabaseError: Если запрос завершился ошибкой
+        """
+        raise NotImplementedError
+
+    def iterate(self, sql: str, params=()):
+        """Перебирает строки результата, не загружая их все в память.
+
+        :raises DatabaseError: Если запрос завершился ошибкой
+        """
+        raise NotImplementedError
+
+    def begin(self) -> None:
+        raise NotImplementedError
+
+    def commit(self) -> None:
+        raise NotImplementedError
+
+    def rollback(self) -> None:
+        raise NotImplementedError
+
+    @contextmanager
+    def transaction(self):
+        """Выполняет блок в транзакции.
+
+        Транзакция фиксируется, если блок завершился без исключения, и
+        откатывается при любом исключении, в том числе при отмене.
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    def fetch_all(self, sql: str, params=()) -> list:
+        """Возвращает все строки результата."""
+        return list(self.iterate(sql, params))
+
+    def fetch_one(self, sql: str, params=()):
+        """Возвращает первую строку результата или None."""
+        rows = self.iterate(sql, params)
+        try:
+            return next(rows, None)
+        finally:
+            rows.close()
+
+    def fetch_value(self, sql: str, params=(), default=None):
+        """Возвращает первое значение первой строки результата."""
+        row = self.fetch_one(sql, params)
+        return row[0] if row is not None else default
+
+    def data_version(self) -> int:
+        """Возвращает счетчик изменений базы из других соединений."""
+        return self.fetch_value('PRAGMA data_version', default=0)
+
+
+class SqliteDatabase(Database):
+    """Соединение через стандартный модуль sqlite3.
+
+    Модуль не начинает транзакции сам (isolation_level = None): как и
+    в QtSql, каждый запрос вне transaction() фиксируется сразу.
+    Подготовленные запросы кэширует sqlite3 по тексту SQL.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = None
+
+    def open(self) -> bool:
+        try:
+            self.connection = sqlite3.connect(
+                self.path, isolation_level=None
+            )
+        except sqlite3.Error as error:
+            print('Ошибка открытия базы:', error)
+            return False
+        return True
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def execute(self, sql: str, params=()) -> int:
+        try:
+            cursor = self.connection.execute(sql, params)
+        except sqlite3.Error as error:
+            raise DatabaseError(str(error)) from error
+        return max(cursor.rowcount, 0)
+
+    def iterate(self, sql: str, params=()):
+        try:
+            cursor = self.connection.execute(sql, params)
+        except sqlite3.Error as error:
+            raise DatabaseError(str(error)) from error
+        try:
+            yield from cursor
+        except sqlite3.Error as error:
+            raise DatabaseError(str(error)) from error
+        finally:
+            cursor.close()
+
+    def begin(self) -> None:
+        self.execute('BEGIN')
+
+    def commit(self) -> None:
+        self.execute('COMMIT')
+
+    def rollback(self) -> None:
+        # SQLite сам откатывает транзакцию после некоторых ошибок.
+        if self.connection.in_transaction:
+            self.execute('ROLLBACK')
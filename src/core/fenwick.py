@@ -0,0 +1,205 @@
+from array import array
+
+from src.core.statistics import CategoryTotals
+
+# Поля итогов за день: доходы, расходы, число доходов, число расходов.
+FIELDS = 4
+# Запас дней при расширении индекса, чтобы операции за следующие дни
+# не перестраивали деревья каждый раз.
+GROWTH_DAYS = 366
+
+
+class FenwickTree:
+    """Дерево Фенвика над массивом целых.
+
+    Изменение элемента и сумма первых n элементов стоят O(log размера).
+    """
+
+    def __init__(self, size: int):
+        self.tree = array('q', bytes(8 * (size + 1)))
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    @classmethod
+    def from_values(cls, values) -> 'FenwickTree':
+        """Строит дерево по значениям элементов за O(n)."""
+        values = list(values)
+        fenwick = cls(len(values))
+        tree = fenwick.tree
+        size = len(values)
+        for index, value in enumerate(values, 1):
+            tree[index] += value
+            parent = index + (index & -index)
+            if parent <= size:
+                tree[parent] += tree[index]
+        return fenwick
+
+    def add(self, index: int, delta: int) -> None:
+        """Прибавляет delta к элементу index (с нуля)."""
+        tree = self.tree
+        size = len(tree) - 1
+        index += 1
+        while index <= size:
+            tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, count: int) -> int:
+        """Возвращает сумму первых count элементов."""
+        tree = self.tree
+        total = 0
+        while count > 0:
+            total += tree[count]
+            count -= count & -count
+        return total
+
+    def range_sum(self, lo: int, hi: int) -> int:
+        """Возвращает сумму элементов lo..hi - 1."""
+        return self.prefix_sum(hi) - self.prefix_sum(lo)
+
+    def values(self) -> list:
+        """Восстанавливает значения элементов."""
+        sums = [self.prefix_sum(count) for count in range(len(self) + 1)]
+        return [b - a for a, b in zip(sums, sums[1:])]
+
+
+class FenwickIndex:
+    """Итоги операций по дням для каждой категории в деревьях Фенвика.
+
+    Для категории хранится FIELDS деревьев, элемент i которых — итог
+    за день first_day + i (номера дней — date.toordinal()). Изменение
+    операции и сумма за любой диапазон дней стоят O(log числа дней),
+    поэтому статистику большого периода можно держать открытой и
+    редактировать операции без запросов к базе.
+    """
+
+    def __init__(self):
+        self.first_day = None
+        self.day_count = 0
+        self.categories = {}
+
+    def load(self, rows) -> None:
+        """Строит индекс по итогам за дни.
+
+        :param rows: Кортежи (номер дня, категория, доходы, расходы,
+            число доходов, число расходов)
+        """
+        daily = {}
+        for day, category, *values in rows:
+            daily.setdefault(category, {})[day] = values
+        days = [day for totals in daily.values() for day in totals]
+
+        self.categories = {}
+        if not days:
+            self.first_day = None
+            self.day_count = 0
+            return
+        self.first_day = min(days)
+        self.day_count = max(days) - self.first_day + 1
+
+        for category, totals in daily.items():
+            columns = [[0] * self.day_count for _ in range(FIELDS)]
+            for day, values in totals.items():
+                for field in range(FIELDS):
+                    columns[field][day - self.first_day] = values[field]
+            self.categories[category] = [
+                FenwickTree.from_values(column) for column in columns
+            ]
+
+    def add(self, day: int, category: str, amount: int) -> None:
+        """Учитывает операцию дня day."""
+        self._update(day, category, amount >= 0, amount, 1)
+
+    def remove(self, day: int, category: str, amount: int) -> None:
+        """Убирает операцию дня day."""
+        self._update(day, category, amount >= 0, -amount, -1)
+
+    def range_totals(
+        self, first_day: int = None, last_day: int = None
+    ) -> CategoryTotals:
+        """Возвращает суммы по категориям за дни first_day..last_day.
+
+        Граница None означает начало или конец всей истории.
+        """
+        totals = CategoryTotals()
+        lo, hi = self._bounds(first_day, last_day)
+        if lo >= hi:
+            return totals
+        for category, trees in self.categories.items():
+            income, outcome, income_count, outcome_count = (
+                tree.range_sum(lo, hi) for tree in trees
+            )
+            if income_count:
+                totals.add(category, income, income_count)
+            if outcome_count:
+                totals.add(category, outcome, outcome_count)
+        return totals
+
+    def category_range(
+        self, category: str, first_day: int, last_day: int
+    ) -> tuple:
+        """Возвращает (доходы, расходы) категории за дни диапазона."""
+        trees = self.categories.get(category)
+        lo, hi = self._bounds(first_day, last_day)
+        if trees is None or lo >= hi:
+            return 0, 0
+        return trees[0].range_sum(lo, hi), trees[1].range_sum(lo, hi)
+
+    def _bounds(self, first_day: int, last_day: int) -> tuple:
+        """Индексы элементов для дней first_day..last_day."""
+        if self.first_day is None:
+            return 0, 0
+        lo = 0 if first_day is None else first_day - self.first_day
+        hi = (
+            self.day_count if last_day is None
+            else last_day - self.first_day + 1
+        )
+        return (
+            min(max(lo, 0), self.day_count),
+            min(max(hi, 0), self.day_count)
+        )
+
+    def _update(
+        self, day: int, category: str, is_income: bool, amount: int,
+        count: int
+    ) -> None:
+        self._cover(day)
+        if category not in self.categories:
+            self.categories[category] = [
+                FenwickTree(self.day_count) for _ in range(FIELDS)
+            ]
+        trees = self.categories[category]
+        amount_field, count_field = (0, 2) if is_income else (1, 3)
+        trees[amount_field].add(day - self.first_day, amount)
+        trees[count_field].add(day - self.first_day, count)
+
+    def _cover(self, day: int) -> None:
+        """Перестраивает деревья так, чтобы в них попадал день day.
+
+        Индекс расширяется с запасом GROWTH_DAYS в сторону нового дня.
+        """
+        if self.first_day is None:
+            self.first_day = day
+            self.day_count = GROWTH_DAYS
+            for category in self.categories:
+                self.categories[category] = [
+                    FenwickTree(self.day_count) for _ in range(FIELDS)
+                ]
+            return
+        if day < self.first_day:
+            before = self.first_day - day + GROWTH_DAYS
+            after = 0
+        elif day >= self.first_day + self.day_count:
+            before = 0
+            after = day - self.first_day - self.day_count + GROWTH_DAYS
+        else:
+            return
+        for category, trees in self.categories.items():
+            self.categories[category] = [
+                FenwickTree.from_values(
+                    [0] * before + tree.values() + [0] * after
+                )
+                for tree in trees
+            ]
+        self.first_day -= before
+        self.day_count += before + after
@@ -0,0 +1,442 @@
+from datetime import date, datetime, timedelta
+
+from src.core.cache import LRUCache
+from src.core.database import Database, SqliteDatabase
+from src.core.fenwick import FenwickIndex
+from src.core.periods import (
+    day_number, financial_months, format_range, period_range
+)
+from src.core.statistics import CategoryTotals
+from src.database.connection_settings import (
+    apply_connection_settings, config_path, load_connection_settings
+)
+from src.database.migrations import REBUILD_ROLLUPS, migrate
+from src.database.query_builder import (
+    date_range_condition, month_range_condition
+)
+
+
+class Ledger:
+    """Операции, период и статистика над одним соединением с базой.
+
+    Не зависит от Qt: по умолчанию работает через sqlite3, а окна
+    используют наследника MainWindowHandler с соединением QtSql.
+    """
+
+    DEFAULT_CATEGORIES = [
+        'Жилье',
+        'Продукты',
+        'Развлечения',
+        'Транспорт',
+        'Другое'
+    ]
+
+    DATABASE_NAME = 'finance_db.db'
+    STATISTICS_CACHE_SIZE = 16
+
+    def __init__(self, database: Database = None):
+        self.database = database or SqliteDatabase(self.DATABASE_NAME)
+        self.connection_settings = load_connection_settings(
+            config_path(self.database.path)
+        )
+        self.date_range = None
+        self.start_day = 1
+        self.rollup_start_day = None
+        self.date_filter = '1=1'
+        self.date_params = []
+        self.totals = CategoryTotals()
+        # Поколение данных увеличивается при каждом изменении данных
+        # через это соединение. Изменения из других соединений видны по
+        # PRAGMA data_version. Оба значения входят в ключ кэша статистики.
+        self.data_generation = 0
+        self.statistics_cache = LRUCache(self.STATISTICS_CACHE_SIZE)
+        # Итоги по дням загружаются при первом запросе статистики, которую
+        # не покрывают помесячные итоги, и перечитываются после изменений
+        # из других соединений.
+        self.day_index = None
+        self.day_index_version = None
+
+    def initialize_database(self) -> bool:
+        """Открывает базу данных и обновляет её схему до текущей версии."""
+        return self.database.open() and self.prepare_database()
+
+    def prepare_database(self) -> bool:
+        """Применяет миграции к открытой базе и настраивает соединение."""
+        if not migrate(self.database):
+            return False
+        self.configure_connection()
+        self._initialize_default_categories()
+        return True
+
+    def open_connection(self) -> bool:
+        """Открывает соединение с уже подготовленной базой данных.
+
+        Используется дополнительными соединениями (например, фонового
+        потока), которым не нужно применять миграции.
+        """
+        if not self.database.open():
+            return False
+        self.configure_connection()
+        return True
+
+    def configure_connection(self) -> None:
+        """Настраивает открытое соединение.
+
+        PRAGMA берутся из профиля в finance_tracker.ini рядом с файлом
+        базы. Базу открывают два соединения (интерфейс и фоновый поток),
+        поэтому профили включают WAL и busy_timeout: чтение не блокирует
+        запись, а занятая запись ожидается, а не завершается ошибкой.
+        """
+        apply_connection_settings(self.database, self.connection_settings)
+        self.rollup_start_day = self.database.fetch_value(
+            "SELECT Value FROM settings "
+            "WHERE Key = 'financial_month_start_day'"
+        )
+
+    def close(self) -> None:
+        """Закрывает соединение с базой данных."""
+        self.database.close()
+
+    def _initialize_default_categories(self):
+        """Инициализирует базовые категории при первом запуске."""
+        if self.database.fetch_value('SELECT COUNT(*) FROM categories'):
+            return
+        for category in self.DEFAULT_CATEGORIES:
+            self.database.execute(
+                'INSERT INTO categories (Name) VALUES (?)', [category]
+            )
+
+    def execute(self, sql: str, params=()) -> int:
+        """Выполняет изменяющий запрос и возвращает число измененных
+        строк. Если строки изменились, поколение данных растет.
+
+        :raises DatabaseError: Если запрос завершился ошибкой
+        """
+        affected = self.database.execute(sql, params)
+        if affected > 0:
+            self.data_generation += 1
+        return affected
+
+    def set_financial_month_start_day(self, start_day: int) -> None:
+        """Задает день начала финансового месяца для помесячных итогов.
+
+        Если день отличается от сохраненного в базе, таблицы
+        finance_rollups и financial_periods пересчитываются по новым
+        границам месяцев.
+        """
+        saved_day = self.database.fetch_value(
+            "SELECT Value FROM settings "
+            "WHERE Key = 'financial_month_start_day'"
+        )
+        changed = saved_day is not None and saved_day != start_day
+        if changed:
+            with self.database.transaction():
+                self.execute(
+                    "UPDATE settings SET Value = ? "
+                    "WHERE Key = 'financial_month_start_day'",
+                    [start_day]
+                )
+                for sql in REBUILD_ROLLUPS:
+                    self.execute(sql)
+        self.rollup_start_day = start_day
+        self.update_financial_periods(rebuild=changed)
+
+    def update_financial_periods(self, rebuild: bool = False) -> None:
+        """Заполняет календарь финансовых месяцев financial_periods.
+
+        Календарь покрывает годы от первой операции до года после
+        последней (или текущего). Он перестраивается при смене дня
+        начала месяца и дополняется, если операции вышли за его границы.
+        """
+        first_date, last_date = self.database.fetch_one(
+            'SELECT MIN(Date), MAX(Date) FROM finances'
+        )
+        this_year = date.today().year
+        first_year = int(first_date[:4]) if first_date else this_year
+        last_year = int(last_date[:4]) if last_date else this_year
+        first_year = min(first_year, this_year)
+        last_year = max(last_year, this_year) + 1
+
+        first_month, last_month = self.database.fetch_one(
+            'SELECT MIN(Month), MAX(Month) FROM financial_periods'
+        )
+        covered = (
+            first_month is not None
+            and first_month <= f'{first_year:04d}-01'
+            and last_month >= f'{last_year:04d}-12'
+        )
+        if covered and not rebuild:
+            return
+
+        with self.database.transaction():
+            self.execute('DELETE FROM financial_periods')
+            for period in financial_months(
+                first_year, last_year, self.rollup_start_day
+            ):
+                self.execute(
+                    'INSERT INTO financial_periods '
+                    '(Month, StartDate, EndDate) VALUES (?, ?, ?)',
+                    period
+                )
+
+    def set_period(self, period='current_month', start_day=1):
+        """Выбирает период, общий для таблицы операций и статистики.
+
+        Условие по датам вычисляется один раз и затем используется
+        всеми запросами, пока период не сменится.
+
+        :param period: Название периода или диапазон (начало, конец)
+        """
+        self.start_day = start_day
+        self.date_range = self.get_date_range(period, start_day)
+        self.date_filter, self.date_params = date_range_condition(
+            self.date_range
+        )
+
+    def load_statistics(self) -> None:
+        """Загружает суммы по категориям за выбранный период.
+
+        Дальше суммы обновляются по дельте при изменении операций.
+        Если период уже загружался и данные с тех пор не менялись,
+        суммы берутся из кэша без запроса к базе.
+        """
+        key = self.get_statistics_key()
+        totals = self.statistics_cache.get(key)
+        if totals is None:
+            rollup_filter = (
+                None if self.is_day_index_loaded()
+                else self.get_rollup_filter(self.start_day)
+            )
+            if rollup_filter:
+                totals = self.fetch_rollup_totals(rollup_filter)
+            else:
+                totals = self.fetch_range_totals(self.date_range)
+            self.statistics_cache.put(key, totals)
+        self.totals = totals
+
+    def get_statistics_key(self) -> tuple:
+        """Возвращает ключ кэша статистики для выбранного периода."""
+        return self.date_range, self.data_generation, self.get_data_version()
+
+    def get_data_version(self) -> int:
+        """Возвращает счетчик изменений базы из других соединений."""
+        return self.database.data_version()
+
+    def in_period(self, date: str) -> bool:
+        """Проверяет, попадает ли дата операции в выбранный период."""
+        if not self.date_range:
+            return True
+        start_str, end_str = self.date_range
+        return start_str <= date <= end_str
+
+    def update_statistics(self, old: dict = None, new: dict = None) -> None:
+        """Переносит изменение одной операции в суммы текущего периода.
+
+        :param dict old: Операция до изменения (None для новой)
+        :param dict new: Операция после изменения (None для удаленной)
+        """
+        if old and self.in_period(old['date']):
+            self.totals.remove(old['category'], old['balance'])
+        if new and self.in_period(new['date']):
+            self.totals.add(new['category'], new['balance'])
+        if self.day_index is not None:
+            if old:
+                self.day_index.remove(
+                    day_number(old['date']), old['category'], old['balance']
+                )
+            if new:
+                self.day_index.add(
+                    day_number(new['date']), new['category'], new['balance']
+                )
+        # Кэш других периодов устаревает, а суммы текущего периода уже
+        # актуальны и остаются в кэше под новым поколением.
+        self.data_generation += 1
+        self.statistics_cache.put(self.get_statistics_key(), self.totals)
+
+    def mark_bulk_change(self) -> None:
+        """Сбрасывает суммы после массового изменения операций.
+
+        Вызывается, когда операции изменены в обход update_statistics
+        (например, импортом) или когда переименована или удалена
+        категория: итоги по дням хранятся по названиям категорий. Кэш
+        статистики и итоги по дням загружаются заново при следующем
+        обращении.
+        """
+        self.data_generation += 1
+        self.statistics_cache.clear()
+        self.day_index = None
+
+    def fetch_category_totals(self):
+        """Загружает суммы доходов и расходов по категориям за период.
+
+        Агрегация выполняется в SQLite: в Python попадает по одной строке
+        на пару (категория, знак суммы), а не каждая операция. Группировка
+        идет по CategoryID, названия подставляются уже к итогам.
+        """
+        sql_query = f'''
+            SELECT c.Name, t.total, t.count
+            FROM (
+                SELECT CategoryID, Balance >= 0 AS is_income,
+                       SUM(Balance) AS total, COUNT(*) AS count
+                FROM finances
+                WHERE {self.date_filter}
+                GROUP BY CategoryID, is_income
+            ) t
+            LEFT JOIN categories c ON c.ID = t.CategoryID
+        '''
+        totals = CategoryTotals()
+        for name, total, count in self.database.iterate(
+            sql_query, self.date_params
+        ):
+            totals.add(name, total, count)
+        return totals
+
+    def is_day_index_loaded(self) -> bool:
+        """Проверяет, загружены ли актуальные итоги по дням."""
+        return (
+            self.day_index is not None
+            and self.day_index_version == self.get_data_version()
+        )
+
+    def get_day_index(self) -> FenwickIndex:
+        """Возвращает итоги по дням и категориям в деревьях Фенвика.
+
+        Индекс строится по таблице daily_totals, которую поддерживают
+        триггеры, и дальше обновляется по дельте в update_statistics.
+        Если базу изменило другое соединение, индекс строится заново.
+        """
+        if not self.is_day_index_loaded():
+            rows = [
+                (day_number(day), *values)
+                for day, *values in self.database.iterate('''
+                    SELECT d.Day, c.Name, d.Income, d.Outcome,
+                           d.IncomeCount, d.OutcomeCount
+                    FROM daily_totals d
+                    LEFT JOIN categories c ON c.ID = d.CategoryID
+                ''')
+            ]
+            self.day_index = FenwickIndex()
+            self.day_index.load(rows)
+            self.day_index_version = self.get_data_version()
+        return self.day_index
+
+    def fetch_range_totals(self, date_range=None):
+        """Возвращает суммы по категориям за диапазон целых дней.
+
+        Суммы считаются по итогам за дни без агрегирующего запроса к
+        finances: O(log числа дней) на категорию. Для date_range = None
+        возвращаются суммы за всю историю.
+        """
+        if not date_range:
+            return self.get_day_index().range_totals()
+        start_str, end_str = date_range
+        return self.get_day_index().range_totals(
+            day_number(start_str), day_number(end_str)
+        )
+
+    def fetch_rollup_totals(self, rollup_filter: tuple):
+        """Загружает суммы по категориям из помесячных итогов.
+
+        Годовой период читает не больше 12 строк на категорию, сколько
+        бы операций ни было в finances.
+
+        :param tuple rollup_filter: Условие и параметры из
+            get_rollup_filter
+        """
+        rollup_where, rollup_params = rollup_filter
+        sql_query = f'''
+            SELECT c.Name, t.income, t.income_count,
+                   t.outcome, t.outcome_count
+            FROM (
+                SELECT CategoryID,
+                       SUM(Income) AS income,
+                       SUM(IncomeCount) AS income_count,
+                       SUM(Outcome) AS outcome,
+                       SUM(OutcomeCount) AS outcome_count
+                FROM finance_rollups
+                WHERE {rollup_where}
+                GROUP BY CategoryID
+            ) t
+            LEFT JOIN categories c ON c.ID = t.CategoryID
+        '''
+        totals = CategoryTotals()
+        for name, income, income_count, outcome, outcome_count in (
+            self.database.iterate(sql_query, rollup_params)
+        ):
+            if income_count:
+                totals.add(name, income, income_count)
+            if outcome_count:
+                totals.add(name, outcome, outcome_count)
+        return totals
+
+    def fetch_monthly_totals(self) -> list:
+        """Возвращает доходы и расходы по каждому финансовому месяцу.
+
+        Вся история группируется одним запросом: операции соединяются
+        с календарем financial_periods по диапазону дат, и для каждого
+        месяца SQLite ищет его операции по индексу Date.
+
+        :return: Список (месяц 'YYYY-MM', доходы, расходы)
+        """
+        self.update_financial_periods()
+        return self.database.fetch_all('''
+            SELECT p.Month,
+                   SUM(CASE WHEN f.Balance >= 0 THEN f.Balance ELSE 0 END),
+                   SUM(CASE WHEN f.Balance < 0 THEN f.Balance ELSE 0 END)
+            FROM financial_periods p
+            JOIN finances f ON f.Date BETWEEN p.StartDate AND p.EndDate
+            GROUP BY p.Month
+            ORDER BY p.Month
+        ''')
+
+    def get_rollup_filter(self, start_day: int):
+        """Формирует условие по finance_rollups для выбранного периода.
+
+        Возвращает пару (условие, параметры) или None, если период не
+        состоит из целых финансовых месяцев с тем же днем начала, что и
+        у сохраненных итогов, или кончается последним днем календаря
+        datetime (период без --to в командной строке).
+        """
+        if start_day != self.rollup_start_day:
+            return None
+        if not self.date_range:
+            return date_range_condition(None)
+
+        start_str, end_str = self.date_range
+        start_date = datetime.strptime(start_str, '%Y-%m-%d %H:%M')
+        end_date = datetime.strptime(end_str, '%Y-%m-%d %H:%M')
+        if end_date.date() == date.max:
+            return None
+        next_start = end_date + timedelta(minutes=1)
+        if (
+            start_date.day != start_day
+            or start_date.hour or start_date.minute
+            or next_start.day != start_day
+            or next_start.hour or next_start.minute
+        ):
+            return None
+
+        first_month = start_date.strftime('%Y-%m')
+        last_month = end_date - timedelta(days=start_day - 1)
+        last_month = last_month.strftime('%Y-%m')
+        return month_range_condition(first_month, last_month)
+
+    def get_category_statistics_detailed(self, top_n=7):
+        """
+        Возвращает статистику по категориям с разделением на доходы/расходы
+        за период, выбранный в set_period. Суммы берутся из self.totals,
+        поэтому вызов не обращается к базе данных.
+        """
+        return self.totals.summary(top_n)
+
+    def get_date_filter(self, period='current_month', start_day: int = 1):
+        """Возвращает SQL-условие для периода и его параметры."""
+        return date_range_condition(self.get_date_range(period, start_day))
+
+    def get_date_range(self, period='current_month', start_day: int = 1):
+        """Возвращает границы периода строками в формате столбца Date.
+
+        Для периода без ограничений возвращает None.
+        """
+        bounds = period_range(period, start_day)
+        return format_range(*bounds) if bounds else None
@@ -0,0 +1,59 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+# Суммы хранятся и агрегируются в копейках (целые числа). В рубли они
+# переводятся только при вводе и при отображении.
+MINOR_UNITS = 100
+# Копейки хранятся в INTEGER SQLite, то есть в 64-битном целом.
+MIN_MINOR = -2 ** 63
+MAX_MINOR = 2 ** 63 - 1
+
+
+def to_minor_units(value) -> int:
+    """Переводит сумму в рублях (строка или число) в копейки.
+
+    Принимает запятую в качестве десятичного разделителя.
+    """
+    text = str(value).strip().replace(',', '.')
+    # Обычная запись с не более чем двумя знаками после точки переводится
+    # целочисленно: импорт выписок вызывает функцию для каждой строки.
+    # До 16 цифр рублей сумма в копейках заведомо помещается в INTEGER.
+    whole, _, fraction = text.partition('.')
+    digits = whole[1:] if whole.startswith('-') else whole
+    if (
+        digits.isascii() and digits.isdigit() and len(digits) <= 16
+        and len(fraction) <= 2 and (fraction.isdigit() or not fraction)
+        and fraction.isascii()
+    ):
+        minor = int(digits) * MINOR_UNITS + int(fraction.ljust(2, '0'))
+        return -minor if whole.startswith('-') else minor
+    # Decimal принимает и 'inf', 'nan', а quantize слишком большой суммы
+    # ('1e999') бросает InvalidOperation, а не ValueError.
+    try:
+        amount = Decimal(text)
+        if not amount.is_finite():
+            raise InvalidOperation
+        minor = int(
+            (amount * MINOR_UNITS).quantize(
+                Decimal(1), rounding=ROUND_HALF_UP
+            )
+        )
+    except InvalidOperation:
+        raise ValueError(f'Некорректная сумма: {value!r}')
+    if not MIN_MINOR <= minor <= MAX_MINOR:
+        raise ValueError(f'Слишком большая сумма: {value!r}')
+    return minor
+
+
+def format_amount(minor: int) -> str:
+    """Форматирует копейки как сумму в рублях: 150 -> '1.50', 200 -> '2'."""
+    rubles, kopecks = divmod(abs(minor), MINOR_UNITS)
+    sign = '-' if minor < 0 else ''
+    if kopecks:
+        return f'{sign}{rubles}.{kopecks:02d}'
+    return f'{sign}{rubles}'
+
+
+def whole_rubles(minor: int) -> int:
+    """Возвращает целую часть суммы в рублях (с отбрасыванием копеек)."""
+    rubles = abs(minor) // MINOR_UNITS
+    return -rubles if minor < 0 else rubles
@@ -0,0 +1,136 @@
+import calendar
+from datetime import date, datetime, timedelta
+
+# Границы периодов — даты начала и конца включительно. Финансовый месяц
+# начинается в день start_day; если в месяце меньше дней, он начинается
+# в последний день месяца. Месяц называется по месяцу своего начала,
+# квартал и год состоят из трех и двенадцати финансовых месяцев,
+# начиная с января.
+
+PERIODS = [
+    'today',
+    'current_week',
+    'current_month',
+    'previous_month',
+    'current_quarter',
+    'current_year',
+    'all',
+]
+
+
+def month_start(year: int, month: int, start_day: int = 1) -> date:
+    """Возвращает первый день финансового месяца year-month."""
+    days_in_month = calendar.monthrange(year, month)[1]
+    return date(year, month, min(start_day, days_in_month))
+
+
+def add_months(year: int, month: int, months: int) -> tuple:
+    """Сдвигает пару (год, месяц) на months месяцев."""
+    index = year * 12 + month - 1 + months
+    return index // 12, index % 12 + 1
+
+
+def financial_month(day: date, start_day: int = 1) -> tuple:
+    """Возвращает (год, месяц) финансового месяца, содержащего day."""
+    if day >= month_start(day.year, day.month, start_day):
+        return day.year, day.month
+    return add_months(day.year, day.month, -1)
+
+
+def months_range(
+    year: int, month: int, months: int, start_day: int = 1
+) -> tuple:
+    """Границы months финансовых месяцев, начиная с year-month."""
+    next_year, next_month = add_months(year, month, months)
+    return (
+        month_start(year, month, start_day),
+        month_start(next_year, next_month, start_day) - timedelta(days=1)
+    )
+
+
+def day_range(day: date) -> tuple:
+    """Границы одного дня."""
+    return day, day
+
+
+def iso_week_range(day: date) -> tuple:
+    """Границы недели ISO (с понедельника по воскресенье)."""
+    monday = day - timedelta(days=day.weekday())
+    return monday, monday + timedelta(days=6)
+
+
+def financial_month_range(day: date, start_day: int = 1) -> tuple:
+    """Границы финансового месяца, содержащего day."""
+    return months_range(*financial_month(day, start_day), 1, start_day)
+
+
+def quarter_range(day: date, start_day: int = 1) -> tuple:
+    """Границы финансового квартала, содержащего day."""
+    year, month = financial_month(day, start_day)
+    return months_range(year, (month - 1) // 3 * 3 + 1, 3, start_day)
+
+
+def year_range(day: date, start_day: int = 1) -> tuple:
+    """Границы финансового года, содержащего day."""
+    year, _ = financial_month(day, start_day)
+    return months_range(year, 1, 12, start_day)
+
+
+def period_range(period, start_day: int = 1, today: date = None):
+    """Возвращает границы периода относительно today.
+
+    :param period: Название периода из PERIODS или произвольный диапазон
+        (начало, конец) из дат
+    :return: (начало, конец) или None для 'all' и неизвестных периодов
+    """
+    if isinstance(period, tuple):
+        return period
+    today = today or date.today()
+    if period == 'today':
+        return day_range(today)
+    if period == 'current_week':
+        return iso_week_range(today)
+    if period == 'current_month':
+        return financial_month_range(today, start_day)
+    if period == 'previous_month':
+        current_start, _ = financial_month_range(today, start_day)
+        return financial_month_range(
+            current_start - timedelta(days=1), start_day
+        )
+    if period == 'current_quarter':
+        return quarter_range(today, start_day)
+    if period == 'current_year':
+        return year_range(today, start_day)
+    return None
+
+
+def format_range(start: date, end: date) -> tuple:
+    """Переводит границы в строки формата столбца Date.
+
+    Последний день входит в период целиком. Год всегда из четырех
+    цифр: strftime не дополняет нулями годы до 1000.
+    """
+    return f'{start.isoformat()} 00:00', f'{end.isoformat()} 23:59'
+
+
+def parse_date(value: str) -> date:
+    """Читает дату из значения столбца Date ('YYYY-MM-DD HH:MM')."""
+    return datetime.strptime(value[:10], '%Y-%m-%d').date()
+
+
+def day_number(value: str) -> int:
+    """Возвращает номер дня (date.toordinal()) значения столбца Date."""
+    return parse_date(value).toordinal()
+
+
+def financial_months(
+    first_year: int, last_year: int, start_day: int = 1
+):
+    """Перечисляет финансовые месяцы годов first_year..last_year.
+
+    :return: Кортежи ('YYYY-MM', начало, конец) в формате столбца Date
+    """
+    for year in range(first_year, last_year + 1):
+        for month in range(1, 13):
+            start, end = months_range(year, month, 1, start_day)
+            yield (f'{year:04d}-{month:02d}', *format_range(start, end))
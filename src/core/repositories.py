@@ -0,0 +1,246 @@
+from datetime import datetime
+
+from src.core.database import DatabaseError
+from src.database.query_builder import operations_filter
+
+FALLBACK_CATEGORY = 'Другое'
+OPERATION_FIELDS = ['id', 'date', 'category', 'description', 'balance']
+
+
+def _parse_operation_date(date):
+    """Переводит дату из формата окна ('DD.MM.YYYY HH:MM') в формат
+    столбца Date. Дата уже в формате столбца ('YYYY-MM-DD HH:MM')
+    только проверяется."""
+    if isinstance(date, str):
+        try:
+            date_obj = datetime.strptime(date, "%d.%m.%Y %H:%M")
+        except ValueError:
+            date_obj = datetime.strptime(date, "%Y-%m-%d %H:%M")
+        date = date_obj.strftime("%Y-%m-%d %H:%M")
+    return date
+
+
+class OperationRepository:
+    """Чтение и изменение операций с учетом статистики Ledger."""
+
+    def __init__(self, db_handler):
+        self.db_handler = db_handler
+        self.database = db_handler.database
+
+    def add_operation(self, date, category, description, balance) -> bool:
+        """Добавляет новую операцию и учитывает ее в статистике периода."""
+        date = _parse_operation_date(date)
+        query = '''
+            INSERT INTO finances (Date, CategoryID, Description, Balance)
+            VALUES (?, (SELECT ID FROM categories WHERE Name=?), ?, ?)
+        '''
+        try:
+            self.db_handler.execute(
+                query, [date, category, description, balance]
+            )
+        except DatabaseError as error:
+            print('Ошибка при добавлении операции:', error)
+            return False
+        self.db_handler.update_statistics(new={
+            'date': date, 'category': category, 'balance': balance
+        })
+        return True
+
+    def edit_operation(
+        self, operation_id, date, category, description, balance
+    ) -> bool:
+        """Редактирует существующую операцию.
+
+        Статистика периода обновляется по разнице старой и новой версий.
+        """
+        date = _parse_operation_date(date)
+        old_operation = self.get_operation_by_id(operation_id)
+        if old_operation is None:
+            print('Ошибка при изменении операции: нет операции', operation_id)
+            return False
+        query = '''
+            UPDATE finances
+            SET Date=?,
+                CategoryID=(SELECT ID FROM categories WHERE Name=?),
+                Description=?,
+                Balance=?
+            WHERE ID=?
+        '''
+        try:
+            self.db_handler.execute(
+                query, [date, category, description, balance, operation_id]
+            )
+        except DatabaseError as error:
+            print('Ошибка при изменении операции:', error)
+            return False
+        self.db_handler.update_statistics(old_operation, {
+            'date': date, 'category': category, 'balance': balance
+        })
+        return True
+
+    def delete_operation(self, operation_id) -> bool:
+        """Удаляет операцию по ID и вычитает ее из статистики периода."""
+        old_operation = self.get_operation_by_id(operation_id)
+        try:
+            self.db_handler.execute(
+                'DELETE FROM finances WHERE ID=?', [operation_id]
+            )
+        except DatabaseError as error:
+            print('Ошибка при удалении операции:', error)
+            return False
+        self.db_handler.update_statistics(old=old_operation)
+        return True
+
+    def get_operation_by_id(self, operation_id):
+        """Возвращает данные операции по ID."""
+        row = self.database.fetch_one(
+            '''
+            SELECT f.ID, f.Date, c.Name AS Category, f.Description, f.Balance
+            FROM finances f
+            LEFT JOIN categories c ON c.ID = f.CategoryID
+            WHERE f.ID = ?
+            ''',
+            [operation_id]
+        )
+        if row is None:
+            return None
+        return dict(zip(OPERATION_FIELDS, row))
+
+    def find_operations(
+        self, date_range=None, category: str = None, text: str = None,
+        limit: int = None
+    ) -> list:
+        """Возвращает операции по фильтрам operations_filter, начиная с
+        последних.
+
+        :param int limit: Наибольшее число операций, None — все
+        :return: Список словарей, как у get_operation_by_id
+        """
+        where, params = operations_filter(date_range, category, text=text)
+        sql = f'''
+            SELECT f.ID, f.Date, c.Name, f.Description, f.Balance
+            FROM finances f
+            LEFT JOIN categories c ON c.ID = f.CategoryID
+            WHERE {where}
+            ORDER BY f.Date DESC, f.ID DESC
+        '''
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params = [*params, limit]
+        return [
+            dict(zip(OPERATION_FIELDS, row))
+            for row in self.database.iterate(sql, params)
+        ]
+
+    def get_all_categories(self) -> list:
+        """Возвращает список всех категорий из базы данных."""
+        categories = []
+        other_category = None
+
+        for category, in self.database.iterate('SELECT Name FROM categories'):
+            if category == FALLBACK_CATEGORY:
+                other_category = category
+            else:
+                categories.append(category)
+
+        categories.sort()
+        if other_category:
+            categories.append(other_category)
+
+        return categories
+
+
+class CategoryRepository:
+    """Чтение и изменение списка категорий."""
+
+    FALLBACK_CATEGORY = FALLBACK_CATEGORY
+
+    def __init__(self, parent_handler):
+        self.db_handler = parent_handler
+        self.database = parent_handler.database
+
+    def add_category(self, name: str) -> bool:
+        """Добавляет новую категорию в базу данных."""
+        try:
+            self.db_handler.execute(
+                'INSERT INTO categories (Name) VALUES (?)', [name]
+            )
+        except DatabaseError as error:
+            print('Ошибка при добавлении категории:', error)
+            return False
+        return True
+
+    def fetch_all_categories(self) -> list[str]:
+        """Возвращает список всех категорий из базы данных."""
+        return [
+            name for name, in self.database.iterate(
+                'SELECT Name FROM categories'
+            )
+        ]
+
+    def delete_category(self, name: str) -> bool:
+        """Удаляет категорию из базы данных.
+
+        Операции удаляемой категории в той же транзакции переносятся
+        в категорию "Другое", чтобы не осталось ссылок на удаленный ID.
+        Суммы в памяти хранятся по названиям категорий, поэтому после
+        удаления или переименования они загружаются заново.
+        """
+        try:
+            with self.database.transaction():
+                self.db_handler.execute(
+                    '''
+                    UPDATE finances
+                    SET CategoryID = (
+                        SELECT ID FROM categories WHERE Name = ?
+                    )
+                    WHERE CategoryID = (
+                        SELECT ID FROM categories WHERE Name = ?
+                    )
+                    ''',
+                    [self.FALLBACK_CATEGORY, name]
+                )
+                self.db_handler.execute(
+                    'DELETE FROM categories WHERE Name = ?', [name]
+                )
+        except DatabaseError as error:
+            print('Ошибка при удалении категории:', error)
+            return False
+        self.db_handler.mark_bulk_change()
+        return True
+
+    def get_operations_count(self, name: str) -> int:
+        """Возвращает количество операций с указанной категорией."""
+        return self.database.fetch_value(
+            '''
+            SELECT COUNT(*) FROM finances
+            WHERE CategoryID = (SELECT ID FROM categories WHERE Name = ?)
+            ''',
+            [name], default=0
+        )
+
+    def category_exists(self, name: str) -> bool:
+        """Проверяет, существует ли категория с таким именем."""
+        return self.database.fetch_value(
+            'SELECT COUNT(*) FROM categories WHERE Name = ?', [name],
+            default=0
+        ) > 0
+
+    def get_category_count(self) -> int:
+        """Возвращает количество категорий в базе данных."""
+        return self.database.fetch_value(
+            'SELECT COUNT(*) FROM categories', default=0
+        )
+
+    def update_category(self, old_name: str, new_name: str) -> bool:
+        """Обновляет название категории в базе данных."""
+        try:
+            self.db_handler.execute(
+                'UPDATE categories SET Name = ? WHERE Name = ?',
+                [new_name, old_name]
+            )
+        except DatabaseError as error:
+            print('Ошибка при обновлении категории:', error)
+            return False
+        self.db_handler.mark_bulk_change()
+        return True
@@ -0,0 +1,92 @@
+OTHER_CATEGORY = 'Остальное'
+
+
+def calculate_shares(items: dict, total_amount: int, top_n: int) -> dict:
+    """Возвращает top_n категорий с долями, остальные сводит в одну."""
+    if not items or total_amount == 0:
+        return {}
+
+    if total_amount < 0:
+        sorted_items = sorted(
+            items.items(), key=lambda x: abs(x[1]), reverse=True
+        )
+        total_amount = abs(total_amount)
+    else:
+        sorted_items = sorted(
+            items.items(), key=lambda x: x[1], reverse=True
+        )
+
+    top_items = sorted_items[:top_n]
+    other_sum = sum(v for _, v in sorted_items[top_n:])
+
+    result = {}
+    for category, amount in top_items:
+        result[category] = {
+            'sum': amount,
+            'share': (abs(amount) / total_amount) * 100
+        }
+
+    if other_sum != 0 and len(sorted_items) > top_n:
+        result[OTHER_CATEGORY] = {
+            'sum': other_sum,
+            'share': (abs(other_sum) / total_amount) * 100
+        }
+
+    return result
+
+
+class CategoryTotals:
+    """Суммы доходов и расходов по категориям за период.
+
+    Загружается один раз агрегирующим запросом, а затем обновляется
+    по дельте при добавлении, изменении и удалении операций. Для каждой
+    категории хранится и число операций, чтобы категория исчезала из
+    статистики ровно тогда, когда из нее ушла последняя операция.
+    """
+
+    def __init__(self):
+        self.income = {}
+        self.outcome = {}
+        self.total_income = 0
+        self.total_outcome = 0
+
+    def add(self, category: str, amount: int, count: int = 1) -> None:
+        """Добавляет count операций категории на общую сумму amount."""
+        self._update(amount >= 0, category, amount, count)
+
+    def remove(self, category: str, amount: int) -> None:
+        """Убирает из сумм одну операцию."""
+        self._update(amount >= 0, category, -amount, -1)
+
+    def _update(
+        self, is_income: bool, category: str, amount: int, count: int
+    ) -> None:
+        stats = self.income if is_income else self.outcome
+        total, old_count = stats.get(category, (0, 0))
+        if old_count + count > 0:
+            stats[category] = (total + amount, old_count + count)
+        else:
+            stats.pop(category, None)
+        if is_income:
+            self.total_income += amount
+        else:
+            self.total_outcome += amount
+
+    def summary(self, top_n: int = 7) -> dict:
+        """Возвращает суммы и доли top_n категорий доходов и расходов."""
+        income = {name: total for name, (total, _) in self.income.items()}
+        outcome = {name: total for name, (total, _) in self.outcome.items()}
+        return {
+            'income': {
+                'total': self.total_income,
+                'categories': calculate_shares(
+                    income, self.total_income, top_n
+                )
+            },
+            'outcome': {
+                'total': self.total_outcome,
+                'categories': calculate_shares(
+                    outcome, self.total_outcome, top_n
+                )
+            }
+        }
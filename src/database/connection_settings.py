@@ -0,0 +1,102 @@
+import configparser
+import os
+
+from src.core.database import Database, DatabaseError
+
+CONFIG_NAME = 'finance_tracker.ini'
+CONFIG_SECTION = 'database'
+
+# Порядок важен: journal_mode переключается до остальных настроек.
+PRAGMAS = [
+    'journal_mode',
+    'synchronous',
+    'cache_size',
+    'mmap_size',
+    'temp_store',
+    'busy_timeout',
+    'foreign_keys',
+]
+
+PROFILES = {
+    # WAL позволяет читать базу, пока фоновый поток пишет в нее, а с
+    # synchronous = NORMAL коммит в WAL не ждет fsync основного файла.
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+    # Для баз в сотни тысяч операций: больший кэш страниц и чтение
+    # файла через mmap, чтобы годовые выборки не копировали страницы.
+    'large': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+}
+DEFAULT_PROFILE = 'default'
+
+
+def config_path(database_path: str = None) -> str:
+    """Возвращает путь к файлу конфигурации рядом с файлом базы.
+
+    Для базы в памяти или без пути файл ищется в текущем каталоге.
+    """
+    if not database_path or database_path == ':memory:':
+        return CONFIG_NAME
+    return os.path.join(
+        os.path.dirname(os.path.abspath(database_path)), CONFIG_NAME
+    )
+
+
+def load_connection_settings(path: str = CONFIG_NAME) -> dict:
+    """Возвращает настройки соединения из файла конфигурации.
+
+    Секция [database] задает профиль (profile = large) и, при
+    необходимости, отдельные PRAGMA поверх него:
+
+        [database]
+        profile = large
+        cache_size = -131072
+
+    Если файла нет или он не читается, используется профиль default.
+    """
+    config = configparser.ConfigParser()
+    try:
+        config.read(path, encoding='utf-8')
+    except configparser.Error as error:
+        print('Ошибка чтения настроек базы:', error)
+    section = (
+        config[CONFIG_SECTION] if config.has_section(CONFIG_SECTION) else {}
+    )
+
+    profile = section.get('profile', DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        print('Неизвестный профиль настроек базы:', profile)
+        profile = DEFAULT_PROFILE
+
+    settings = dict(PROFILES[profile])
+    for name in PRAGMAS:
+        if name in section:
+            settings[name] = section[name]
+    return settings
+
+
+def apply_connection_settings(database: Database, settings: dict) -> None:
+    """Применяет PRAGMA из settings к открытому соединению."""
+    for name in PRAGMAS:
+        value = str(settings.get(name, ''))
+        if not value.lstrip('-').isalnum():
+            print(f'Недопустимое значение {name}:', value)
+            continue
+        try:
+            database.execute(f'PRAGMA {name} = {value}')
+        except DatabaseError as error:
+            print(f'Ошибка настройки {name}:', error)
@@ -0,0 +1,397 @@
+from src.core.database import Database, DatabaseError
+
+# Финансовый месяц операции: дата сдвигается назад на (день начала - 1)
+# дней, и берется календарный месяц результата. День начала хранится в
+# settings, чтобы триггеры и перестроение считали месяц одинаково.
+ROLLUP_MONTH = '''strftime(
+    '%Y-%m', {row}.Date, '-' || ((
+        SELECT Value FROM settings WHERE Key = 'financial_month_start_day'
+    ) - 1) || ' days'
+)'''
+
+# День операции для daily_totals.
+DAILY_DAY = 'date({row}.Date)'
+
+
+def _totals_rebuild(table: str, key: str, key_expr: str) -> list:
+    """Команды, пересчитывающие таблицу итогов по всей таблице finances.
+
+    :param str key: Столбец периода в таблице итогов
+    :param str key_expr: Выражение периода для строки {row} таблицы
+        finances
+    """
+    return [
+        f'DELETE FROM {table}',
+        f'''
+        INSERT INTO {table} (
+            {key}, CategoryID, Income, Outcome, IncomeCount, OutcomeCount
+        )
+        SELECT {key_expr.format(row='finances')} AS {key},
+               IFNULL(CategoryID, 0),
+               SUM(CASE WHEN Balance >= 0 THEN Balance ELSE 0 END),
+               SUM(CASE WHEN Balance < 0 THEN Balance ELSE 0 END),
+               SUM(Balance >= 0),
+               SUM(Balance < 0)
+        FROM finances
+        GROUP BY {key}, IFNULL(CategoryID, 0)
+        ''',
+    ]
+
+
+def _totals_triggers(
+    name: str, table: str, key: str, key_expr: str
+) -> dict:
+    """Триггеры, переносящие изменения finances в таблицу итогов.
+
+    :param str name: Часть имени триггеров finances_{name}_*
+    :return: {имя триггера: CREATE TRIGGER}
+    """
+    add = f'''
+        INSERT INTO {table} (
+            {key}, CategoryID, Income, Outcome, IncomeCount, OutcomeCount
+        )
+        VALUES (
+            {key_expr.format(row='NEW')},
+            IFNULL(NEW.CategoryID, 0),
+            CASE WHEN NEW.Balance >= 0 THEN NEW.Balance ELSE 0 END,
+            CASE WHEN NEW.Balance < 0 THEN NEW.Balance ELSE 0 END,
+            NEW.Balance >= 0,
+            NEW.Balance < 0
+        )
+        ON CONFLICT ({key}, CategoryID) DO UPDATE SET
+            Income = Income + excluded.Income,
+            Outcome = Outcome + excluded.Outcome,
+            IncomeCount = IncomeCount + excluded.IncomeCount,
+            OutcomeCount = OutcomeCount + excluded.OutcomeCount;
+    '''
+    remove = f'''
+        UPDATE {table} SET
+            Income = Income
+                - CASE WHEN OLD.Balance >= 0 THEN OLD.Balance ELSE 0 END,
+            Outcome = Outcome
+                - CASE WHEN OLD.Balance < 0 THEN OLD.Balance ELSE 0 END,
+            IncomeCount = IncomeCount - (OLD.Balance >= 0),
+            OutcomeCount = OutcomeCount - (OLD.Balance < 0)
+        WHERE {key} = {key_expr.format(row='OLD')}
+          AND CategoryID = IFNULL(OLD.CategoryID, 0);
+        DELETE FROM {table}
+        WHERE {key} = {key_expr.format(row='OLD')}
+          AND CategoryID = IFNULL(OLD.CategoryID, 0)
+          AND IncomeCount = 0 AND OutcomeCount = 0;
+    '''
+    return {
+        f'finances_{name}_insert': f'''
+        CREATE TRIGGER finances_{name}_insert AFTER INSERT ON finances
+        BEGIN
+            {add}
+        END
+        ''',
+        f'finances_{name}_delete': f'''
+        CREATE TRIGGER finances_{name}_delete AFTER DELETE ON finances
+        BEGIN
+            {remove}
+        END
+        ''',
+        f'finances_{name}_update': f'''
+        CREATE TRIGGER finances_{name}_update
+        AFTER UPDATE OF Date, CategoryID, Balance ON finances
+        BEGIN
+            {remove}
+            {add}
+        END
+        ''',
+    }
+
+
+# Пересчитывает finance_rollups по всей таблице finances.
+REBUILD_ROLLUPS = _totals_rebuild('finance_rollups', 'Month', ROLLUP_MONTH)
+ROLLUP_TRIGGERS = _totals_triggers(
+    'rollup', 'finance_rollups', 'Month', ROLLUP_MONTH
+)
+
+REBUILD_DAILY_TOTALS = _totals_rebuild('daily_totals', 'Day', DAILY_DAY)
+DAILY_TRIGGERS = _totals_triggers('daily', 'daily_totals', 'Day', DAILY_DAY)
+
+# Текущие индексы finances (миграции 5 и 10). Массовый импорт удаляет
+# их вместе с триггерами итогов на время вставки и создает заново после.
+FINANCES_INDEXES = {
+    'idx_finances_date': '''
+    CREATE INDEX idx_finances_date
+    ON finances (Date, CategoryID, Balance)
+    ''',
+    'idx_finances_category_date': '''
+    CREATE INDEX idx_finances_category_date
+    ON finances (CategoryID, Date)
+    ''',
+    'idx_finances_sort_category': '''
+    CREATE INDEX idx_finances_sort_category
+    ON finances (CategoryID)
+    ''',
+    'idx_finances_sort_description': '''
+    CREATE INDEX idx_finances_sort_description
+    ON finances (IFNULL(Description, ''))
+    ''',
+    'idx_finances_sort_balance': '''
+    CREATE INDEX idx_finances_sort_balance
+    ON finances (Balance)
+    ''',
+}
+
+# Уникальный индекс отпечатков импорта. Массовый импорт его не удаляет:
+# по нему INSERT OR IGNORE отбрасывает повторы.
+IMPORT_HASH_INDEX = '''
+    CREATE UNIQUE INDEX idx_finances_import_hash
+    ON finances (ImportHash) WHERE ImportHash IS NOT NULL
+    '''
+
+# Каждая миграция — список SQL-команд. Номер версии схемы равен
+# порядковому номеру миграции и хранится в PRAGMA user_version.
+MIGRATIONS = [
+    # 1: исходная схема. IF NOT EXISTS позволяет пройти этот шаг базам,
+    # созданным до появления миграций.
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS finances (
+            ID integer primary key AUTOINCREMENT,
+            Date VARCHAR(20),
+            Category VARCHAR(20),
+            Description VARCHAR(20),
+            Balance REAL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS categories (
+            ID integer primary key AUTOINCREMENT,
+            Name VARCHAR(20) UNIQUE
+        )
+        ''',
+    ],
+    # 2: фильтр по периоду. Индекс покрывает запрос статистики,
+    # поэтому таблица при агрегации не читается.
+    [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_finances_date
+        ON finances (Date, Category, Balance)
+        ''',
+    ],
+    # 3: поиск по категории и по категории внутри периода.
+    # Префикс (Category) обслуживает запросы только по категории.
+    [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_finances_category_date
+        ON finances (Category, Date)
+        ''',
+    ],
+    # 4: суммы хранятся в копейках в целочисленном столбце. SQLite не
+    # меняет тип столбца через ALTER, поэтому таблица пересоздается.
+    [
+        '''
+        CREATE TABLE finances_new (
+            ID integer primary key AUTOINCREMENT,
+            Date VARCHAR(20),
+            Category VARCHAR(20),
+            Description VARCHAR(20),
+            Balance INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        INSERT INTO finances_new (ID, Date, Category, Description, Balance)
+        SELECT ID, Date, Category, Description,
+               CAST(ROUND(Balance * 100) AS INTEGER)
+        FROM finances
+        ''',
+        'DROP TABLE finances',
+        'ALTER TABLE finances_new RENAME TO finances',
+        '''
+        CREATE INDEX idx_finances_date
+        ON finances (Date, Category, Balance)
+        ''',
+        '''
+        CREATE INDEX idx_finances_category_date
+        ON finances (Category, Date)
+        ''',
+    ],
+    # 5: операции ссылаются на категорию по ID. Переименование категории
+    # больше не переписывает finances. Названия, которых нет в categories,
+    # добавляются туда, чтобы ни одна операция не потеряла категорию.
+    [
+        '''
+        INSERT OR IGNORE INTO categories (Name)
+        SELECT DISTINCT Category FROM finances WHERE Category IS NOT NULL
+        ''',
+        '''
+        CREATE TABLE finances_new (
+            ID integer primary key AUTOINCREMENT,
+            Date VARCHAR(20),
+            CategoryID INTEGER REFERENCES categories (ID),
+            Description VARCHAR(20),
+            Balance INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        INSERT INTO finances_new (ID, Date, CategoryID, Description, Balance)
+        SELECT f.ID, f.Date, c.ID, f.Description, f.Balance
+        FROM finances f
+        LEFT JOIN categories c ON c.Name = f.Category
+        ''',
+        'DROP TABLE finances',
+        'ALTER TABLE finances_new RENAME TO finances',
+        '''
+        CREATE INDEX idx_finances_date
+        ON finances (Date, CategoryID, Balance)
+        ''',
+        '''
+        CREATE INDEX idx_finances_category_date
+        ON finances (CategoryID, Date)
+        ''',
+    ],
+    # 6: помесячные итоги по категориям, которые поддерживаются
+    # триггерами. Операции без категории учитываются с CategoryID = 0.
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS settings (
+            Key VARCHAR(50) PRIMARY KEY,
+            Value
+        )
+        ''',
+        '''
+        INSERT OR IGNORE INTO settings (Key, Value)
+        VALUES ('financial_month_start_day', 1)
+        ''',
+        '''
+        CREATE TABLE finance_rollups (
+            Month VARCHAR(7) NOT NULL,
+            CategoryID INTEGER NOT NULL,
+            Income INTEGER NOT NULL DEFAULT 0,
+            Outcome INTEGER NOT NULL DEFAULT 0,
+            IncomeCount INTEGER NOT NULL DEFAULT 0,
+            OutcomeCount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (Month, CategoryID)
+        ) WITHOUT ROWID
+        ''',
+        *ROLLUP_TRIGGERS.values(),
+        *REBUILD_ROLLUPS,
+    ],
+    # 7: календарь финансовых месяцев с границами в формате столбца Date.
+    # Заполняется приложением (src/core/periods.py) и перестраивается
+    # при смене дня начала месяца.
+    [
+        '''
+        CREATE TABLE financial_periods (
+            Month VARCHAR(7) PRIMARY KEY,
+            StartDate VARCHAR(20) NOT NULL,
+            EndDate VARCHAR(20) NOT NULL
+        ) WITHOUT ROWID
+        ''',
+    ],
+    # 8: итоги по дням и категориям для индекса дней
+    # (src/core/fenwick.py). Поддерживаются триггерами, как и помесячные
+    # итоги.
+    [
+        '''
+        CREATE TABLE daily_totals (
+            Day VARCHAR(10) NOT NULL,
+            CategoryID INTEGER NOT NULL,
+            Income INTEGER NOT NULL DEFAULT 0,
+            Outcome INTEGER NOT NULL DEFAULT 0,
+            IncomeCount INTEGER NOT NULL DEFAULT 0,
+            OutcomeCount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (Day, CategoryID)
+        ) WITHOUT ROWID
+        ''',
+        *DAILY_TRIGGERS.values(),
+        *REBUILD_DAILY_TOTALS,
+    ],
+    # 9: отпечаток импортированной операции (src/imports/import_pipeline.py)
+    # для пропуска повторов при повторном импорте выписок. У операций,
+    # добавленных вручную, он пустой и в индекс не попадает.
+    [
+        'ALTER TABLE finances ADD COLUMN ImportHash INTEGER',
+        IMPORT_HASH_INDEX,
+    ],
+    # 10: порядок сортировки таблицы операций по категории, описанию и
+    # сумме (src/main_window/operations_table_model.py). В индекс SQLite
+    # неявно добавляет ID, поэтому строки с равным ключом уже идут по ID
+    # и страница читается без сортировки всей выборки.
+    [
+        '''
+        CREATE INDEX idx_finances_sort_category
+        ON finances (CategoryID)
+        ''',
+        '''
+        CREATE INDEX idx_finances_sort_description
+        ON finances (IFNULL(Description, ''))
+        ''',
+        '''
+        CREATE INDEX idx_finances_sort_balance
+        ON finances (Balance)
+        ''',
+    ],
+]
+
+# Запросы, которые выполняются на каждом обновлении окна или при
+# изменении категорий. Ни один из них не должен сканировать finances.
+HOT_QUERIES = [
+    '''
+    SELECT CategoryID, Balance >= 0 AS is_income, SUM(Balance)
+    FROM finances
+    WHERE Date BETWEEN ? AND ?
+    GROUP BY CategoryID, is_income
+    ''',
+    'SELECT * FROM finances WHERE Date BETWEEN ? AND ?',
+    'SELECT COUNT(*) FROM finances WHERE CategoryID=?',
+    'UPDATE finances SET CategoryID=? WHERE CategoryID=?',
+    '''
+    SELECT p.Month, SUM(f.Balance)
+    FROM financial_periods p
+    JOIN finances f ON f.Date BETWEEN p.StartDate AND p.EndDate
+    GROUP BY p.Month
+    ''',
+]
+
+
+def get_schema_version(database: Database) -> int:
+    """Возвращает текущую версию схемы базы данных."""
+    return database.fetch_value('PRAGMA user_version', default=0)
+
+
+def migrate(database: Database) -> bool:
+    """Применяет к базе все миграции новее её текущей версии.
+
+    Каждая миграция выполняется в отдельной транзакции вместе с
+    обновлением user_version, поэтому прерванный запуск не оставляет
+    схему в промежуточном состоянии.
+    """
+    version = get_schema_version(database)
+    if version >= len(MIGRATIONS):
+        return True
+
+    for number in range(version + 1, len(MIGRATIONS) + 1):
+        try:
+            with database.transaction():
+                for sql in MIGRATIONS[number - 1]:
+                    database.execute(sql)
+                database.execute(f'PRAGMA user_version = {number}')
+        except DatabaseError as error:
+            print(f'Ошибка миграции {number}:', error)
+            return False
+
+    for sql in find_unindexed_queries(database):
+        print('Запрос выполняется без индекса:', ' '.join(sql.split()))
+    return True
+
+
+def find_unindexed_queries(database: Database) -> list[str]:
+    """Возвращает горячие запросы, план которых сканирует finances."""
+    unindexed = []
+    for sql in HOT_QUERIES:
+        try:
+            plan = database.fetch_all(
+                f'EXPLAIN QUERY PLAN {sql}', [None] * sql.count('?')
+            )
+        except DatabaseError:
+            continue
+        # Столбцы плана: id, parent, notused, detail.
+        if any(row[3].startswith('SCAN finances') for row in plan):
+            unindexed.append(sql)
+    return unindexed
@@ -0,0 +1,93 @@
+from PySide6 import QtSql
+
+from src.core.cache import LRUCache
+from src.core.database import Database, DatabaseError
+
+
+class QtDatabase(Database):
+    """Соединение ядра поверх QSqlDatabase.
+
+    Окна и их фоновые потоки работают с базой через QtSql: у каждого
+    потока свое именованное соединение. Этот класс дает ядру доступ к
+    такому соединению, а модели Qt получают из query готовый QSqlQuery.
+    """
+
+    STATEMENT_CACHE_SIZE = 32
+
+    def __init__(self, db: QtSql.QSqlDatabase):
+        self.db = db
+        self.path = db.databaseName()
+        self.statement_cache = LRUCache(
+            self.STATEMENT_CACHE_SIZE, on_evict=lambda query: query.finish()
+        )
+
+    def open(self) -> bool:
+        if not self.db.open():
+            print('Ошибка открытия базы:', self.db.lastError().text())
+            return False
+        return True
+
+    def close(self) -> None:
+        self.statement_cache.clear()
+        self.db.close()
+
+    def query(self, sql_query: str, params=None) -> QtSql.QSqlQuery:
+        """Выполняет SQL-запрос с параметрами и возвращает QSqlQuery.
+
+        Запросы, не возвращающие строк, после выполнения остаются в кэше
+        подготовленных запросов по тексту SQL: при повторном вызове в них
+        подставляются новые значения без разбора SQL. SELECT не
+        кэшируется: недочитанный результат держал бы открытым снимок
+        чтения WAL, и соединение не видело бы чужих изменений.
+        """
+        query = self.statement_cache.get(sql_query)
+        if query is None:
+            query = QtSql.QSqlQuery(self.db)
+            query.prepare(sql_query)
+
+        for position, value in enumerate(params or []):
+            query.bindValue(position, value)
+
+        if not query.exec():
+            print('Ошибка выполнения запроса:', query.lastError().text())
+        elif not query.isSelect():
+            self.statement_cache.put(sql_query, query)
+        return query
+
+    def execute(self, sql: str, params=()) -> int:
+        query = self.query(sql, params)
+        if query.lastError().isValid():
+            raise DatabaseError(query.lastError().text())
+        if query.isSelect():
+            query.finish()
+            return 0
+        return max(query.numRowsAffected(), 0)
+
+    def iterate(self, sql: str, params=()):
+        """Перебирает строки в режиме forward-only: Qt не кэширует уже
+        прочитанные строки, и память не растет с размером выборки."""
+        query = QtSql.QSqlQuery(self.db)
+        query.setForwardOnly(True)
+        query.prepare(sql)
+        for value in params:
+            query.addBindValue(value)
+        if not query.exec():
+            raise DatabaseError(query.lastError().text())
+        columns = range(query.record().count())
+        value = query.value
+        try:
+            while query.next():
+                yield tuple(map(value, columns))
+        finally:
+            query.finish()
+
+    def begin(self) -> None:
+        if not self.db.transaction():
+            raise DatabaseError(self.db.lastError().text())
+
+    def commit(self) -> None:
+        if not self.db.commit():
+            raise DatabaseError(self.db.lastError().text())
+
+    def rollback(self) -> None:
+        self.db.rollback()
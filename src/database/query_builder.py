@@ -0,0 +1,91 @@
+# Условия WHERE для выборок операций. Каждая функция возвращает пару
+# (sql, params): текст условия с плейсхолдерами ? и значения для них.
+# Текст зависит только от набора фильтров, а не от их значений, поэтому
+# запрос готовится один раз и переиспользуется с новыми параметрами.
+#
+# Условия по дате и категории записаны так, чтобы SQLite искал по
+# индексам (Date, CategoryID, Balance) и (CategoryID, Date): столбец
+# стоит слева от оператора и не обернут в функции.
+
+NO_FILTER = '1=1'
+
+
+def date_range_condition(date_range, column: str = 'Date') -> tuple:
+    """Условие по диапазону дат (start, end) включительно.
+
+    Для date_range = None возвращает условие без ограничений.
+    """
+    if not date_range:
+        return NO_FILTER, []
+    start_str, end_str = date_range
+    return f'{column} BETWEEN ? AND ?', [start_str, end_str]
+
+
+def category_condition(category: str, column: str = 'CategoryID') -> tuple:
+    """Условие по названию категории.
+
+    ID категории находится подзапросом, поэтому сравнение идет по
+    индексированному столбцу CategoryID, а не по JOIN с categories.
+    """
+    return (
+        f'{column} = (SELECT ID FROM categories WHERE Name = ?)',
+        [category]
+    )
+
+
+def sign_condition(income: bool, column: str = 'Balance') -> tuple:
+    """Условие на доходы (income=True) или расходы."""
+    return (f'{column} >= 0' if income else f'{column} < 0'), []
+
+
+def text_condition(text: str, column: str = 'Description') -> tuple:
+    """Условие на вхождение text в описание без учета регистра ASCII.
+
+    Символы % и _ в тексте ищутся буквально.
+    """
+    escaped = (
+        text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    )
+    return f"{column} LIKE ? ESCAPE '\\'", [f'%{escaped}%']
+
+
+def combine_conditions(*conditions) -> tuple:
+    """Объединяет условия через AND, пропуская пустые."""
+    parts = []
+    params = []
+    for sql, values in conditions:
+        if sql != NO_FILTER:
+            parts.append(sql)
+            params.extend(values)
+    if not parts:
+        return NO_FILTER, []
+    if len(parts) == 1:
+        return parts[0], params
+    return ' AND '.join(f'({sql})' for sql in parts), params
+
+
+def operations_filter(
+    date_range=None,
+    category: str = None,
+    income: bool = None,
+    text: str = None
+) -> tuple:
+    """Условие для выборки операций по периоду, категории, знаку и тексту.
+
+    Фильтры со значением None не применяются.
+    """
+    conditions = [date_range_condition(date_range)]
+    if category is not None:
+        conditions.append(category_condition(category))
+    if income is not None:
+        conditions.append(sign_condition(income))
+    if text:
+        conditions.append(text_condition(text))
+    return combine_conditions(*conditions)
+
+
+def month_range_condition(
+    first_month: str, last_month: str, column: str = 'Month'
+) -> tuple:
+    """Условие по диапазону месяцев 'YYYY-MM' включительно."""
+    return f'{column} BETWEEN ? AND ?', [first_month, last_month]
@@ -0,0 +1,131 @@
+import queue
+import threading
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+
+class DatabaseWorker(QThread):
+    """Поток, выполняющий запросы к базе данных вне потока интерфейса.
+
+    Поток открывает собственное соединение: обработчик создается фабрикой
+    handler_factory уже внутри потока. Задачи — функции от обработчика —
+    выполняются строго по очереди, результат передается в callback в
+    потоке интерфейса.
+
+    Задачи с одинаковым key вытесняют друг друга: если в очереди уже есть
+    более новая задача с тем же ключом, старая не выполняется, а ее
+    результат, если она успела выполниться, отбрасывается.
+
+    Если соединение открыть не удалось, поток один раз сообщает об этом
+    сигналом connection_failed и до остановки отклоняет все задачи: их
+    callback не вызывается и не остается ждать.
+    """
+
+    CONNECTION_ERROR = 'Не удалось открыть соединение с базой данных.'
+
+    task_finished = Signal(int, object)
+    task_failed = Signal(int, str)
+    task_rejected = Signal(int)
+    connection_failed = Signal(str)
+
+    def __init__(self, handler_factory, parent=None):
+        super().__init__(parent)
+        self.handler_factory = handler_factory
+        self.tasks = queue.Queue()
+        self.lock = threading.Lock()
+        self.next_request_id = 0
+        self.latest_by_key = {}
+        self.cancelled = set()
+        self.callbacks = {}
+        self.task_finished.connect(self._dispatch)
+        self.task_failed.connect(self._discard)
+        self.task_rejected.connect(self._discard)
+
+    def submit(self, task, callback=None, key: str = None) -> int:
+        """Ставит задачу в очередь и возвращает ее номер.
+
+        :param task: Функция, принимающая обработчик потока
+        :param callback: Функция, получающая результат в потоке интерфейса
+        :param str key: Ключ, по которому более новые задачи вытесняют
+            старые
+        """
+        with self.lock:
+            self.next_request_id += 1
+            request_id = self.next_request_id
+            if key is not None:
+                self.callbacks.pop(self.latest_by_key.get(key), None)
+                self.latest_by_key[key] = request_id
+        if callback is not None:
+            self.callbacks[request_id] = callback
+        self.tasks.put((request_id, key, task))
+        return request_id
+
+    def cancel(self, request_id: int) -> None:
+        """Отменяет задачу и отбрасывает ее результат."""
+        with self.lock:
+            self.cancelled.add(request_id)
+        self.callbacks.pop(request_id, None)
+
+    def stop(self) -> None:
+        """Дожидается выполнения поставленных задач и завершает поток."""
+        if self.isRunning():
+            self.tasks.put(None)
+            self.wait()
+
+    def run(self):
+        handler = self.handler_factory()
+        if not handler.open_connection():
+            self.connection_failed.emit(self.CONNECTION_ERROR)
+            self._reject_tasks()
+            return
+
+        while True:
+            item = self.tasks.get()
+            if item is None:
+                break
+            request_id, key, task = item
+            if self._is_stale(request_id, key):
+                continue
+            try:
+                result = task(handler)
+            except Exception as error:
+                self.task_failed.emit(request_id, str(error))
+                continue
+            if not self._is_stale(request_id, key):
+                self.task_finished.emit(request_id, result)
+
+        handler.close()
+
+    def _reject_tasks(self) -> None:
+        while True:
+            item = self.tasks.get()
+            if item is None:
+                break
+            self.task_rejected.emit(item[0])
+
+    def _is_stale(self, request_id: int, key: str) -> bool:
+        with self.lock:
+            if request_id in self.cancelled:
+                self.cancelled.discard(request_id)
+                return True
+            return (
+                key is not None and self.latest_by_key.get(key) != request_id
+            )
+
+    def _dispatch(self, request_id: int, result) -> None:
+        callback = self.callbacks.pop(request_id, None)
+        if callback is not None:
+            callback(result)
+
+    def _discard(self, request_id: int, _=None) -> None:
+        self.callbacks.pop(request_id, None)
+
+
+class TaskProgress(QObject):
+    """Передает прогресс долгой задачи из потока базы в интерфейс.
+
+    Объект создается в потоке интерфейса, поэтому сигнал, испущенный
+    задачей в DatabaseWorker, доставляется получателям в их потоке.
+    """
+
+    changed = Signal(int, int)
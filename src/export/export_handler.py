@@ -0,0 +1,80 @@
+import os
+
+from src.database.query_builder import operations_filter
+from src.export.export_writers import WRITERS
+
+# Как часто (в операциях) сообщать о прогрессе и проверять отмену.
+PROGRESS_STEP = 1000
+
+
+class ExportCancelled(Exception):
+    """Экспорт остановлен пользователем."""
+
+
+class ExportHandler:
+    def __init__(self, db_handler):
+        self.db_handler = db_handler
+        self.database = db_handler.database
+
+    def count_operations(self, where: str, params: list) -> int:
+        """Возвращает число операций, подходящих под условие."""
+        return self.database.fetch_value(
+            f'SELECT COUNT(*) FROM finances WHERE {where}', params, default=0
+        )
+
+    def iter_operations(self, where: str, params: list):
+        """Перебирает операции по условию, не загружая их все в память
+        (см. Database.iterate)."""
+        return self.database.iterate(f'''
+            SELECT f.Date, c.Name, f.Description, f.Balance
+            FROM finances f
+            LEFT JOIN categories c ON c.ID = f.CategoryID
+            WHERE {where}
+            ORDER BY f.Date, f.ID
+        ''', params)
+
+    def export(
+        self, path: str, date_range=None, category: str = None,
+        progress=None, is_cancelled=None
+    ) -> int:
+        """Записывает операции периода и категории в CSV или XLSX.
+
+        Формат определяется по расширению файла. Если экспорт отменен,
+        недописанный файл удаляется.
+
+        :param progress: Функция (записано, всего), вызываемая каждые
+            PROGRESS_STEP операций
+        :param is_cancelled: Функция, возвращающая True, если экспорт
+            нужно остановить
+        :return: Число записанных операций
+        """
+        extension = os.path.splitext(path)[1].lstrip('.').lower()
+        writer = WRITERS.get(extension)
+        if writer is None:
+            raise ValueError(f'Неподдерживаемый формат файла: {extension}')
+
+        where, params = operations_filter(date_range, category)
+        total = self.count_operations(where, params)
+        rows = self._track(
+            self.iter_operations(where, params), total,
+            progress, is_cancelled
+        )
+        try:
+            return writer(rows, path)
+        except ExportCancelled:
+            os.remove(path)
+            raise
+
+    def _track(self, rows, total: int, progress, is_cancelled):
+        """Пропускает строки, сообщая о прогрессе и проверяя отмену."""
+        written = 0
+        for row in rows:
+            if written % PROGRESS_STEP == 0:
+                if is_cancelled and is_cancelled():
+                    raise ExportCancelled()
+                if progress:
+                    progress(written, total)
+            yield row
+            written += 1
+        if progress:
+            progress(written, total)
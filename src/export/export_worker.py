@@ -0,0 +1,64 @@
+import threading
+
+from PySide6 import QtSql
+from PySide6.QtCore import QThread, Signal
+
+from src.core.database import DatabaseError
+from src.export.export_handler import ExportCancelled, ExportHandler
+
+
+class ExportWorker(QThread):
+    """Поток, записывающий операции в файл.
+
+    Экспорт может идти долго, поэтому у него свой поток и свое
+    соединение: обработчик создается фабрикой handler_factory внутри
+    потока, и запросы статистики в DatabaseWorker не ждут экспорта.
+    """
+
+    progress = Signal(int, int)
+    export_finished = Signal(int)
+    export_failed = Signal(str)
+    export_cancelled = Signal()
+
+    def __init__(
+        self, handler_factory, path: str, date_range=None,
+        category: str = None, parent=None
+    ):
+        super().__init__(parent)
+        self.handler_factory = handler_factory
+        self.path = path
+        self.date_range = date_range
+        self.category = category
+        self.cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        """Останавливает экспорт на ближайшей проверке."""
+        self.cancel_event.set()
+
+    def run(self):
+        handler = self.handler_factory()
+        connection_name = handler.db.connectionName()
+        try:
+            self._export(handler)
+        finally:
+            handler.close()
+            del handler
+            # Следующий экспорт создаст соединение с тем же именем.
+            QtSql.QSqlDatabase.removeDatabase(connection_name)
+
+    def _export(self, handler) -> None:
+        if not handler.open_connection():
+            self.export_failed.emit('Не удалось открыть базу данных.')
+            return
+        try:
+            count = ExportHandler(handler).export(
+                self.path, self.date_range, self.category,
+                progress=self.progress.emit,
+                is_cancelled=self.cancel_event.is_set
+            )
+        except ExportCancelled:
+            self.export_cancelled.emit()
+        except (OSError, ValueError, DatabaseError) as error:
+            self.export_failed.emit(str(error))
+        else:
+            self.export_finished.emit(count)
@@ -0,0 +1,138 @@
+import csv
+import re
+import zipfile
+
+from src.core.money import MINOR_UNITS, format_amount
+
+HEADERS = ['Дата', 'Категория', 'Описание', 'Сумма']
+
+# Неизменяемые части книги XLSX с одним листом. Строки листа
+# записываются потоком, поэтому общих строк (sharedStrings) нет:
+# текст хранится в ячейках как inlineStr.
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'content-types">'
+    '<Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="'
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.'
+    'worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+    '2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/'
+    '2006/main" xmlns:r="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships">'
+    '<sheets><sheet name="Операции" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+    '2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/'
+    '2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+
+def write_csv(rows, path: str) -> int:
+    """Записывает операции в CSV по мере чтения.
+
+    :param rows: Итератор кортежей (дата, категория, описание, сумма в
+        копейках)
+    :return: Число записанных операций
+    """
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8-sig') as file:
+        writer = csv.writer(file, delimiter=';')
+        writer.writerow(HEADERS)
+        for date, category, description, balance in rows:
+            writer.writerow(
+                [date, category or '', description or '',
+                 format_amount(balance)]
+            )
+            count += 1
+    return count
+
+
+# Символы вне диапазона XML 1.0 (управляющие, суррогаты, U+FFFE/U+FFFF),
+# например из текста выписки, сделали бы лист некорректным.
+_INVALID_XML_CHARS = re.compile(
+    '[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]'
+)
+
+
+def _escape(text: str) -> str:
+    # Как xml.sax.saxutils.escape, но без загрузки xml.sax и urllib при
+    # импорте модуля. Недопустимые в XML символы удаляются.
+    text = _INVALID_XML_CHARS.sub('', text)
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _text_cell(value) -> str:
+    return f'<c t="inlineStr"><is><t>{_escape(str(value))}</t></is></c>'
+
+
+def _sheet_row(values) -> str:
+    return f'<row>{"".join(values)}</row>'
+
+
+def write_xlsx(rows, path: str) -> int:
+    """Записывает операции в книгу XLSX по мере чтения.
+
+    Лист пишется прямо в поток архива, в памяти держится одна строка.
+
+    :param rows: Итератор кортежей (дата, категория, описание, сумма в
+        копейках)
+    :return: Число записанных операций
+    """
+    count = 0
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as book:
+        book.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        book.writestr('_rels/.rels', _ROOT_RELS)
+        book.writestr('xl/workbook.xml', _WORKBOOK)
+        book.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        with book.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(_SHEET_START.encode())
+            sheet.write(
+                _sheet_row(_text_cell(name) for name in HEADERS).encode()
+            )
+            for date, category, description, balance in rows:
+                amount = f'<c><v>{balance / MINOR_UNITS}</v></c>'
+                sheet.write(_sheet_row([
+                    _text_cell(date),
+                    _text_cell(category or ''),
+                    _text_cell(description or ''),
+                    amount,
+                ]).encode())
+                count += 1
+            sheet.write(_SHEET_END.encode())
+    return count
+
+
+WRITERS = {
+    'csv': write_csv,
+    'xlsx': write_xlsx,
+}
@@ -0,0 +1,244 @@
+import os
+
+from src.core.repositories import FALLBACK_CATEGORY
+from src.database.migrations import (
+    DAILY_TRIGGERS, FINANCES_INDEXES, REBUILD_DAILY_TOTALS, REBUILD_ROLLUPS,
+    ROLLUP_TRIGGERS
+)
+from src.imports.import_parsers import ImportFormatError
+from src.imports.import_pipeline import (
+    ROW_VALUES, flat_batches, parse_in_processes
+)
+from src.imports.statement_parsers import open_operations
+
+
+class ImportCancelled(Exception):
+    """Импорт остановлен пользователем."""
+
+
+class ImportHandler:
+    """Массовая вставка операций в одной транзакции.
+
+    Строки вставляются пачками по BATCH_ROWS в одном многострочном
+    INSERT с теми же значениями, что add_operation: дата в формате
+    столбца Date, ID категории по названию, сумма в копейках. Текст
+    запроса одинаков для всех полных пачек, поэтому соединение
+    подготавливает его один раз и только подставляет значения.
+
+    Когда вставлено больше DEFER_MAINTENANCE_ROWS строк, триггеры итогов
+    и индексы finances удаляются до конца импорта: вставка больше не
+    обновляет их на каждой строке, а после нее индексы строятся заново
+    и итоги пересчитываются одним запросом. Все это происходит в той же
+    транзакции, и другие соединения видят только результат.
+    """
+
+    BATCH_ROWS = 250
+    DEFER_MAINTENANCE_ROWS = 20000
+    PROGRESS_STEP = 10000
+
+    def __init__(self, db_handler):
+        self.db_handler = db_handler
+        self.database = db_handler.database
+
+    def import_file(
+        self, path: str, mapping: dict = None, progress=None,
+        is_cancelled=None
+    ) -> dict:
+        """Импортирует выписку, выбирая формат по расширению файла.
+
+        :param dict mapping: Явные названия столбцов CSV {поле: столбец}
+        :param progress: Функция (прочитано байт, размер файла)
+        :param is_cancelled: Функция, возвращающая True, если импорт
+            нужно остановить
+        :return: {'imported': число операций, 'duplicates': число уже
+            импортированных операций, 'skipped': номера записей, которые
+            не удалось разобрать (см. open_operations)}
+        """
+        size = os.path.getsize(path)
+        skipped = []
+        details = {}
+        with open_operations(path, mapping, skipped, details) as (
+            operations, position
+        ):
+            imported, duplicates = self.import_operations(
+                operations,
+                self._batch_callback(
+                    lambda: (position(), size), progress, is_cancelled
+                ),
+                details
+            )
+        if progress:
+            progress(size, size)
+        return {
+            'imported': imported, 'duplicates': duplicates,
+            'skipped': skipped
+        }
+
+    def import_files(
+        self, paths: list, mapping: dict = None, progress=None,
+        is_cancelled=None, workers: int = None
+    ) -> dict:
+        """Импортирует несколько выписок в одной транзакции.
+
+        Файлы разбираются параллельно в процессах parse_in_processes,
+        а вставляет их этот обработчик, по мере готовности пачек.
+        Ошибка в любом файле отменяет импорт целиком. Один файл
+        разбирается в текущем процессе, без запуска пула.
+
+        :param int workers: Число процессов разбора
+        :return: Как у import_file, но в 'skipped' — пары (имя файла,
+            номер записи)
+        """
+        if len(paths) == 1:
+            result = self.import_file(
+                paths[0], mapping, progress, is_cancelled
+            )
+            name = os.path.basename(paths[0])
+            result['skipped'] = [
+                (name, number) for number in result['skipped']
+            ]
+            return result
+
+        sizes = [os.path.getsize(path) for path in paths]
+        positions = [0] * len(paths)
+        skipped = []
+        category_ids = self.fetch_category_ids()
+        events = parse_in_processes(
+            paths, mapping, category_ids,
+            category_ids.get(FALLBACK_CATEGORY), self.BATCH_ROWS, workers
+        )
+
+        def batches():
+            for kind, index, *payload in events:
+                if kind == 'error':
+                    raise ImportFormatError(payload[0])
+                if kind == 'done':
+                    positions[index] = sizes[index]
+                    name = os.path.basename(paths[index])
+                    skipped.extend((name, number) for number in payload[0])
+                    continue
+                positions[index], batch = payload
+                yield batch
+
+        try:
+            imported, duplicates = self.insert_batches(
+                batches(),
+                self._batch_callback(
+                    lambda: (sum(positions), sum(sizes)),
+                    progress, is_cancelled
+                )
+            )
+        finally:
+            events.close()
+        if progress:
+            progress(sum(sizes), sum(sizes))
+        return {
+            'imported': imported, 'duplicates': duplicates,
+            'skipped': skipped
+        }
+
+    def import_operations(
+        self, operations, on_batch=None, details: dict = None
+    ) -> tuple:
+        """Вставляет операции в одной транзакции.
+
+        :param operations: Итератор кортежей (дата 'YYYY-MM-DD HH:MM',
+            категория, описание, сумма в копейках). Неизвестные и пустые
+            категории заменяются на "Другое".
+        :param on_batch: см. insert_batches
+        :param dict details: Сведения о выписке для flat_batches
+        :return: см. insert_batches
+        """
+        category_ids = self.fetch_category_ids()
+        return self.insert_batches(
+            flat_batches(
+                operations, category_ids,
+                category_ids.get(FALLBACK_CATEGORY), self.BATCH_ROWS,
+                details
+            ),
+            on_batch
+        )
+
+    def insert_batches(self, batches, on_batch=None) -> tuple:
+        """Вставляет пачки значений из flat_batches в одной транзакции.
+
+        Операции, отпечаток которых уже есть в finances (или раньше
+        встретился в этом импорте), пропускаются самим INSERT OR IGNORE
+        по уникальному индексу ImportHash: повторы отсеиваются одной
+        проверкой на пачку, без отдельного запроса на строку.
+
+        :param on_batch: Функция от числа обработанных операций, которая
+            вызывается каждые PROGRESS_STEP строк и может прервать
+            импорт исключением
+        :return: (число вставленных операций, число повторов)
+        """
+        batch_size = self.BATCH_ROWS * ROW_VALUES
+        batch_sql = self._insert_sql(self.BATCH_ROWS)
+        row_sql = self._insert_sql(1)
+
+        deferred = False
+        processed = imported = 0
+        with self.database.transaction():
+            for batch in batches:
+                if len(batch) == batch_size:
+                    imported += self.database.execute(batch_sql, batch)
+                else:
+                    for start in range(0, len(batch), ROW_VALUES):
+                        imported += self.database.execute(
+                            row_sql, batch[start:start + ROW_VALUES]
+                        )
+                previous = processed
+                processed += len(batch) // ROW_VALUES
+                if processed // self.PROGRESS_STEP == (
+                    previous // self.PROGRESS_STEP
+                ):
+                    continue
+                if on_batch:
+                    on_batch(processed)
+                if not deferred and imported >= self.DEFER_MAINTENANCE_ROWS:
+                    self._drop_maintenance()
+                    deferred = True
+            if deferred:
+                self._restore_maintenance()
+        if imported:
+            self.db_handler.mark_bulk_change()
+        return imported, processed - imported
+
+    def _batch_callback(self, position, progress, is_cancelled):
+        """Возвращает on_batch, который проверяет отмену и сообщает
+        прогресс (позиция, размер) из функции position."""
+        def on_batch(_):
+            if is_cancelled and is_cancelled():
+                raise ImportCancelled()
+            if progress:
+                progress(*position())
+        return on_batch
+
+    def fetch_category_ids(self) -> dict:
+        """Возвращает ID категорий по их названиям."""
+        return dict(self.database.fetch_all('SELECT Name, ID FROM categories'))
+
+    def _insert_sql(self, rows: int) -> str:
+        return (
+            'INSERT OR IGNORE INTO finances '
+            '(Date, CategoryID, Description, Balance, ImportHash) '
+            'VALUES ' + ', '.join(['(?, ?, ?, ?, ?)'] * rows)
+        )
+
+    def _drop_maintenance(self) -> None:
+        """Удаляет триггеры итогов и индексы finances до конца импорта."""
+        for name in [*ROLLUP_TRIGGERS, *DAILY_TRIGGERS]:
+            self.database.execute(f'DROP TRIGGER IF EXISTS {name}')
+        for name in FINANCES_INDEXES:
+            self.database.execute(f'DROP INDEX IF EXISTS {name}')
+
+    def _restore_maintenance(self) -> None:
+        """Создает индексы и триггеры заново и пересчитывает итоги."""
+        for sql in [
+            *FINANCES_INDEXES.values(),
+            *ROLLUP_TRIGGERS.values(),
+            *DAILY_TRIGGERS.values(),
+            *REBUILD_ROLLUPS,
+            *REBUILD_DAILY_TOTALS,
+        ]:
+            self.database.execute(sql)
@@ -0,0 +1,225 @@
+import codecs
+import csv
+import io
+from datetime import date
+
+from src.core.money import MINOR_UNITS, to_minor_units
+
+# Поля операции и названия столбцов, под которыми они встречаются в
+# выписках банков. Сравнение идет без учета регистра.
+COLUMN_ALIASES = {
+    'date': [
+        'дата', 'дата операции', 'дата платежа', 'date',
+        'transaction date', 'posting date',
+    ],
+    'amount': [
+        'сумма', 'сумма операции', 'сумма платежа', 'amount', 'sum',
+    ],
+    'category': ['категория', 'category'],
+    'description': [
+        'описание', 'назначение платежа', 'комментарий', 'description',
+        'memo', 'payee',
+    ],
+}
+REQUIRED_FIELDS = ['date', 'amount']
+ENCODINGS = ['utf-8-sig', 'cp1251']
+SNIFF_BYTES = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """Файл нельзя разобрать как выписку."""
+
+
+def detect_mapping(header: list, mapping: dict = None) -> dict:
+    """Сопоставляет поля операции номерам столбцов.
+
+    :param list header: Названия столбцов из первой строки файла
+    :param dict mapping: Явные названия столбцов {поле: столбец}; поля,
+        которых в нем нет, ищутся по COLUMN_ALIASES
+    :return: {поле: номер столбца}
+    """
+    names = [name.strip().lower() for name in header]
+    mapping = {
+        field: column.strip().lower()
+        for field, column in (mapping or {}).items()
+    }
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in [mapping.get(field)] + aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    missing = [field for field in REQUIRED_FIELDS if field not in columns]
+    if missing:
+        raise ImportFormatError(
+            'Не найдены столбцы: ' + ', '.join(missing)
+        )
+    return columns
+
+
+def _normalize_day(value: str):
+    """Переводит день выписки в формат 'YYYY-MM-DD'.
+
+    Поддерживаются 'DD.MM.YYYY', 'DD/MM/YYYY' и 'YYYY-MM-DD'.
+    Возвращает None, если день не распознан или его нет в календаре
+    (например, 31.02).
+    """
+    if len(value) != 10:
+        return None
+    if value[2] in './' and value[5] == value[2]:
+        day, month, year = value[0:2], value[3:5], value[6:10]
+    elif value[4] == '-' and value[7] == '-':
+        year, month, day = value[0:4], value[5:7], value[8:10]
+    else:
+        return None
+    if not (year + month + day).isdigit():
+        return None
+    try:
+        date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+    return f'{year}-{month}-{day}'
+
+
+class DateParser:
+    """Переводит даты выписки в формат столбца Date ('YYYY-MM-DD HH:MM').
+
+    Даты разбираются срезами строки, без strptime: день — по
+    _normalize_day, необязательное время 'HH:MM' или 'HH:MM:SS' идет
+    после пробела. Дней в выписке намного меньше, чем операций, поэтому
+    разобранные дни запоминаются.
+    """
+
+    def __init__(self):
+        self.days = {}
+
+    def __call__(self, value: str):
+        """Возвращает дату или None, если она не распознана."""
+        value = value.strip()
+        prefix = value[:10]
+        day = self.days.get(prefix)
+        if day is None:
+            day = self.days[prefix] = _normalize_day(prefix)
+            if day is None:
+                return None
+        if len(value) == 10:
+            return day + ' 00:00'
+        time = value[11:16]
+        if (
+            len(time) != 5 or time[2] != ':'
+            or not (time[:2] + time[3:]).isdigit()
+            or time[:2] > '23' or time[3:] > '59'
+        ):
+            return None
+        return f'{day} {time}'
+
+
+def parse_amount(value: str) -> int:
+    """Переводит сумму выписки в копейки.
+
+    Пробелы, в том числе неразрывные, считаются разделителями разрядов.
+    Если в сумме есть и запятая, и точка ('1,234.56' или '1.234,56'),
+    копейки отделяет последний из знаков. Запись вида '-1234,56'
+    разбирается без Decimal. Больше двух значащих знаков после
+    разделителя ('1,234' или '12.345') не округляются, а считаются
+    ошибкой: такую запись нельзя отличить от разрядов тысяч.
+    """
+    value = value.replace(' ', '').replace('\xa0', '').replace('\u202f', '')
+    if ',' in value and '.' in value:
+        value = value.replace(
+            ',' if value.rfind(',') < value.rfind('.') else '.', ''
+        )
+    whole, _, fraction = value.replace(',', '.').partition('.')
+    digits = whole[1:] if whole[:1] == '-' else whole
+    if len(fraction) == 2 and fraction.isdigit() and digits.isdigit():
+        minor = int(digits) * MINOR_UNITS + int(fraction)
+        return -minor if whole[:1] == '-' else minor
+    if fraction.isdigit() and len(fraction.rstrip('0')) > 2:
+        raise ValueError(f'Неоднозначная сумма: {value}')
+    return to_minor_units(value)
+
+
+def detect_encoding(sample: bytes) -> tuple:
+    """Определяет кодировку выписки по ее началу.
+
+    Начало может обрываться посреди символа, поэтому оно декодируется
+    без проверки последнего байта.
+
+    :return: (кодировка, декодированное начало)
+    """
+    for encoding in ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            return encoding, decoder.decode(sample)
+        except UnicodeDecodeError:
+            continue
+    raise ImportFormatError('Не удалось определить кодировку файла.')
+
+
+def open_statement(path: str):
+    """Открывает CSV-выписку, определяя кодировку и разделитель."""
+    with open(path, 'rb') as file:
+        sample = file.read(SNIFF_BYTES)
+    encoding, text = detect_encoding(sample)
+
+    try:
+        dialect = csv.Sniffer().sniff(
+            text.split('\n', 1)[0], delimiters=';,\t'
+        )
+        delimiter = dialect.delimiter
+    except csv.Error:
+        delimiter = ';'
+    file = open(path, 'r', newline='', encoding=encoding)
+    return file, delimiter
+
+
+def read_csv_operations(
+    file: io.TextIOBase,
+    delimiter: str = ';',
+    mapping: dict = None,
+    errors: list = None
+):
+    """Перебирает операции CSV-выписки.
+
+    Строки с нераспознанной датой или суммой пропускаются, их номера
+    добавляются в errors.
+
+    :return: Итератор кортежей (дата, категория, описание, сумма в
+        копейках); категория и описание могут быть None
+    """
+    reader = csv.reader(file, delimiter=delimiter)
+    try:
+        header = next(reader)
+    except StopIteration:
+        return
+    columns = detect_mapping(header, mapping)
+    date_column = columns['date']
+    amount_column = columns['amount']
+    category_column = columns.get('category')
+    description_column = columns.get('description')
+    parse_date = DateParser()
+
+    for line_number, row in enumerate(reader, 2):
+        if not row:
+            continue
+        try:
+            date = parse_date(row[date_column])
+            amount = parse_amount(row[amount_column])
+        except (IndexError, ValueError):
+            date = None
+        if date is None:
+            if errors is not None:
+                errors.append(line_number)
+            continue
+        category = (
+            row[category_column].strip() or None
+            if category_column is not None and category_column < len(row)
+            else None
+        )
+        description = (
+            row[description_column].strip() or None
+            if description_column is not None
+            and description_column < len(row)
+            else None
+        )
+        yield date, category, description, amount
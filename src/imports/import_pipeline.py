@@ -0,0 +1,199 @@
+import hashlib
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+from src.imports.statement_parsers import open_operations
+
+# Разбор выписок в отдельных процессах. Модуль не зависит от Qt:
+# в процессах-обработчиках работают только функции чтения выписок.
+#
+# Каждый процесс разбирает свои файлы целиком и складывает готовые к
+# вставке пачки в общую ограниченную очередь. Их забирает единственный
+# писатель — поток базы данных, — поэтому соединение с SQLite остается
+# одно, а память не растет, даже если разбор обгоняет вставку.
+
+# Значений в пачке на одну операцию: дата, ID категории, описание,
+# сумма, отпечаток.
+ROW_VALUES = 5
+# Сколько пачек может ждать вставки. Дальше процессы разбора ждут.
+QUEUE_BATCHES = 64
+# Как часто (в секундах) писатель проверяет, живы ли процессы, пока
+# очередь пуста.
+POLL_INTERVAL = 0.1
+
+_events = None
+
+
+def normalize_description(description) -> str:
+    """Приводит описание к виду для сравнения: без учета регистра и
+    лишних пробелов."""
+    return ' '.join((description or '').split()).casefold()
+
+
+def operation_hash(
+    date: str, amount: int, description: str, account: str,
+    occurrence: int
+) -> int:
+    """Возвращает отпечаток импортированной операции для столбца
+    ImportHash: 64-битное целое со знаком.
+
+    :param str description: Описание после normalize_description
+    :param int occurrence: Номер одинаковой операции в выписке (1, 2,
+        ...), чтобы две покупки на одну сумму в одну минуту не считались
+        повтором
+    """
+    digest = hashlib.blake2b(
+        f'{date}\x1f{amount}\x1f{description}\x1f{account}\x1f'
+        f'{occurrence}'.encode(),
+        digest_size=8
+    ).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def _occurrence_key(date: str, amount: int, description: str) -> int:
+    """Возвращает ключ счетчика одинаковых операций: 64-битный отпечаток
+    даты, суммы и описания вместо кортежа строк."""
+    digest = hashlib.blake2b(
+        f'{date}\x1f{amount}\x1f{description}'.encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def flat_batches(
+    operations, category_ids: dict, fallback_id, rows: int,
+    details: dict = None
+):
+    """Собирает операции в пачки значений для многострочного INSERT.
+
+    Категории заменяются их ID, неизвестные — на fallback_id, к каждой
+    операции добавляется operation_hash. Одинаковые операции (дата,
+    сумма и описание) нумеруются по всей выписке: выписка не обязана
+    быть упорядочена по дате, и повторы одного дня могут идти не подряд.
+
+    Счетчик хранит на каждую неповторяющуюся операцию 64-битный ключ
+    _occurrence_key и число — около 70 байт, то есть около 20 МБ на
+    выписку в 300 тысяч строк в каждом процессе разбора (с кортежем
+    строк в ключе было около 270 байт). Совпадение ключей двух разных
+    операций лишь сдвигает номер повтора: отпечаток operation_hash
+    все равно считается по полным значениям.
+
+    :param operations: Итератор кортежей (дата, категория, описание,
+        сумма в копейках)
+    :param dict details: Сведения о выписке, которые заполняет функция
+        чтения; 'account' входит в отпечаток
+    :return: Итератор плоских списков [дата, ID категории, описание,
+        сумма, отпечаток, ...] по rows операций; последний список может
+        быть короче
+    """
+    details = details if details is not None else {}
+    size = rows * ROW_VALUES
+    batch = []
+    occurrences = {}
+    for date, category, description, amount in operations:
+        normalized = normalize_description(description)
+        key = _occurrence_key(date, amount, normalized)
+        occurrence = occurrences[key] = occurrences.get(key, 0) + 1
+        batch.extend((
+            date, category_ids.get(category, fallback_id),
+            description, amount,
+            operation_hash(
+                date, amount, normalized,
+                details.get('account', ''), occurrence
+            )
+        ))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _init_worker(events) -> None:
+    # Очередь multiprocessing нельзя передать аргументом задачи, только
+    # при создании процесса.
+    global _events
+    _events = events
+    # Процесс завершается, только когда писатель получил все его события
+    # или отказался от них, поэтому ждать отправки остатка не нужно.
+    events.cancel_join_thread()
+
+
+def _parse_file(
+    index: int, path: str, mapping: dict, category_ids: dict,
+    fallback_id, rows: int
+) -> None:
+    """Разбирает файл в процессе-обработчике и отправляет события
+    ('batch', номер файла, позиция в файле, пачка), затем
+    ('done', номер файла, пропущенные записи) или
+    ('error', номер файла, текст ошибки)."""
+    skipped = []
+    details = {}
+    try:
+        with open_operations(path, mapping, skipped, details) as (
+            operations, position
+        ):
+            for batch in flat_batches(
+                operations, category_ids, fallback_id, rows, details
+            ):
+                _events.put(('batch', index, position(), batch))
+    except Exception as error:
+        _events.put(('error', index, f'{os.path.basename(path)}: {error}'))
+    else:
+        _events.put(('done', index, skipped))
+
+
+def parse_in_processes(
+    paths: list, mapping: dict, category_ids: dict, fallback_id,
+    rows: int, workers: int = None
+):
+    """Разбирает файлы выписок в пуле процессов.
+
+    Процессы запускаются методом spawn: копия процесса с потоками Qt,
+    созданная fork, могла бы зависнуть на захваченной блокировке.
+
+    Если перебор остановлен раньше времени (ошибка вставки или отмена),
+    оставшиеся файлы не разбираются, а уже разобранные пачки
+    отбрасываются, чтобы процессы не ждали места в очереди.
+
+    :param int workers: Число процессов, по умолчанию — по числу ядер
+    :return: Итератор событий, которые отправляет _parse_file
+    """
+    context = multiprocessing.get_context('spawn')
+    events = context.Queue(QUEUE_BATCHES)
+    workers = min(len(paths), workers or os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(
+        workers, mp_context=context,
+        initializer=_init_worker, initargs=(events,)
+    )
+    futures = [
+        executor.submit(
+            _parse_file, index, path, mapping, category_ids,
+            fallback_id, rows
+        )
+        for index, path in enumerate(paths)
+    ]
+    remaining = len(paths)
+    try:
+        while remaining:
+            try:
+                event = events.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                for future in futures:
+                    # Процесс завершился аварийно и не отправил 'done'.
+                    if future.done() and future.exception():
+                        raise future.exception()
+                continue
+            if event[0] != 'batch':
+                remaining -= 1
+            yield event
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        while not all(future.done() for future in futures):
+            try:
+                events.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                pass
+        executor.shutdown()
+        events.close()
@@ -0,0 +1,378 @@
+import contextlib
+import io
+import os
+import re
+from xml.etree import ElementTree
+from xml.sax.saxutils import unescape
+
+from src.imports.import_parsers import (
+    SNIFF_BYTES, DateParser, ImportFormatError, _normalize_day,
+    detect_encoding, open_statement, parse_amount, read_csv_operations
+)
+
+# Выписки OFX, QIF и CAMT.053 читаются потоком: в памяти держится одна
+# запись, а не весь файл, поэтому архив выписок за несколько лет не
+# требует больше памяти, чем выписка за месяц. Каждая функция чтения
+# принимает файл, открытый в двоичном режиме, и список для номеров
+# пропущенных записей и возвращает итератор кортежей (дата, категория,
+# описание, сумма в копейках), как read_csv_operations. Номер счета
+# выписки, если он в ней есть, записывается в details['account'].
+
+READ_CHUNK = 64 * 1024
+
+# Разделы QIF с операциями по счету. Остальные (список счетов, категорий,
+# инвестиции) пропускаются.
+QIF_TRANSACTION_TYPES = {'bank', 'cash', 'ccard', 'oth a', 'oth l'}
+
+# Статусы записей CAMT.053, которые еще не проведены по счету.
+CAMT_PENDING_STATUSES = {'PDNG', 'INFO'}
+
+# Пути к полям записи CAMT.053 (Ntry) в порядке предпочтения. Статус
+# до версии 08 — текст Sts, начиная с 08 — Sts/Cd; у контрагента
+# в новых версиях имя вложено в Pty. Номер счета ищется в Stmt/Acct.
+CAMT_FIELDS = {
+    'account': ['Id/IBAN', 'Id/Othr/Id'],
+    'status': ['Sts/Cd', 'Sts'],
+    'direction': ['CdtDbtInd'],
+    'amount': ['Amt'],
+    'date': ['BookgDt/DtTm', 'BookgDt/Dt', 'ValDt/DtTm', 'ValDt/Dt'],
+    'description': ['NtryDtls/TxDtls/RmtInf/Ustrd', 'AddtlNtryInf'],
+    'creditor': [
+        'NtryDtls/TxDtls/RltdPties/Cdtr/Nm',
+        'NtryDtls/TxDtls/RltdPties/Cdtr/Pty/Nm',
+    ],
+    'debtor': [
+        'NtryDtls/TxDtls/RltdPties/Dbtr/Nm',
+        'NtryDtls/TxDtls/RltdPties/Dbtr/Pty/Nm',
+    ],
+}
+
+# Тег OFX с текстом до следующего тега. В OFX 1.x (SGML) у простых
+# элементов нет закрывающих тегов, в OFX 2.x (XML) они есть; выражение
+# подходит для обоих вариантов.
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+@contextlib.contextmanager
+def _open_text(file: io.BufferedIOBase):
+    """Открывает двоичный файл как текст в определенной по началу
+    кодировке.
+
+    Файл закрывает тот, кто его открыл, поэтому после чтения обертка
+    отсоединяется от него, а не закрывает.
+    """
+    encoding, _ = detect_encoding(file.read(SNIFF_BYTES))
+    file.seek(0)
+    text = io.TextIOWrapper(file, encoding=encoding, errors='replace')
+    try:
+        yield text
+    finally:
+        text.detach()
+
+
+def _ofx_tags(text: io.TextIOBase):
+    """Перебирает теги OFX частями по READ_CHUNK символов.
+
+    :return: Итератор кортежей (закрывающий ли тег, имя, текст после
+        тега)
+    """
+    tail = ''
+    while True:
+        chunk = text.read(READ_CHUNK)
+        data = tail + chunk
+        # Последний тег может быть разрезан границей части, поэтому
+        # он разбирается вместе со следующей частью.
+        end = data.rfind('<') if chunk else len(data)
+        if end == -1:
+            tail = data
+            continue
+        for match in _OFX_TAG.finditer(data, 0, end):
+            yield (
+                match.group(1) == '/', match.group(2).upper(),
+                match.group(3)
+            )
+        if not chunk:
+            return
+        tail = data[end:]
+
+
+def _ofx_date(value: str):
+    """Переводит дату OFX ('YYYYMMDD[HHMMSS[.XXX][[TZ]]]') в формат
+    столбца Date. Часовой пояс не учитывается."""
+    day = _normalize_day(f'{value[0:4]}-{value[4:6]}-{value[6:8]}')
+    if day is None:
+        return None
+    time = value[8:12]
+    if len(time) < 4 or not time.isdigit():
+        return day + ' 00:00'
+    if time[:2] > '23' or time[2:] > '59':
+        return None
+    return f'{day} {time[:2]}:{time[2:]}'
+
+
+def read_ofx_operations(
+    file: io.BufferedIOBase, errors: list = None, details: dict = None
+):
+    """Перебирает операции выписки OFX (STMTTRN).
+
+    Описание берется из NAME, а если его нет — из MEMO. Категорий в OFX
+    нет, поэтому все операции попадают в категорию по умолчанию.
+    В errors добавляются порядковые номера пропущенных операций.
+    """
+    with _open_text(file) as text:
+        transaction = None
+        number = 0
+        for closing, name, value in _ofx_tags(text):
+            if name == 'STMTTRN':
+                if not closing:
+                    transaction = {}
+                    continue
+                if transaction is None:
+                    continue
+                number += 1
+                date = _ofx_date(transaction.get('DTPOSTED', ''))
+                try:
+                    amount = parse_amount(transaction.get('TRNAMT', ''))
+                except ValueError:
+                    date = None
+                if date is None:
+                    if errors is not None:
+                        errors.append(number)
+                else:
+                    description = (
+                        transaction.get('NAME') or transaction.get('MEMO')
+                    )
+                    yield date, None, description, amount
+                transaction = None
+            elif closing:
+                continue
+            elif transaction is not None:
+                value = unescape(value.strip())
+                if value:
+                    transaction.setdefault(name, value)
+            elif name == 'ACCTID' and details is not None:
+                details['account'] = value.strip()
+
+
+def _qif_date(value: str):
+    """Переводит дату QIF в формат 'YYYY-MM-DD'.
+
+    'DD.MM.YYYY' и 'YYYY-MM-DD' разбираются как в CSV. Даты через '/'
+    записаны по правилам Quicken: 'MM/DD/YYYY', 'MM/DD/YY' и "MM/DD'YY",
+    где апостроф обозначает год после 2000.
+    """
+    value = value.replace(' ', '')
+    parts = value.replace("'", '/').split('/')
+    if len(parts) != 3:
+        return _normalize_day(value)
+    month, day, year = parts
+    if not (month.isdigit() and day.isdigit() and year.isdigit()):
+        return None
+    if len(year) == 2:
+        century = 2000 if "'" in value or int(year) < 70 else 1900
+        year = str(century + int(year))
+    return _normalize_day(f'{year}-{month.zfill(2)}-{day.zfill(2)}')
+
+
+def _qif_category(value: str):
+    """Возвращает категорию верхнего уровня из поля L
+    ('Категория:Подкатегория/Класс'). Переводы между счетами ('[Счет]')
+    категории не имеют."""
+    if not value or value.startswith('['):
+        return None
+    return value.split('/', 1)[0].split(':', 1)[0].strip() or None
+
+
+def read_qif_operations(
+    file: io.BufferedIOBase, errors: list = None, details: dict = None
+):
+    """Перебирает операции выписки QIF.
+
+    Из каждой записи берутся дата (D), сумма (T или U), получатель (P)
+    или комментарий (M) и категория (L). Строки разбивки (S, E, $)
+    не разбираются: сохраняется общая сумма записи. В errors добавляются
+    номера первых строк пропущенных записей. Счетом выписки считается
+    последний счет (N) из раздела !Account.
+    """
+    with _open_text(file) as text:
+        in_transactions = True
+        in_accounts = False
+        record = {}
+        first_line = None
+        for line_number, line in enumerate(text, 1):
+            line = line.strip()
+            if not line:
+                continue
+            code, value = line[0], line[1:].strip()
+            if code == '!':
+                header = value.lower()
+                if header.startswith('type:'):
+                    section = header[5:].strip()
+                    in_transactions = section in QIF_TRANSACTION_TYPES
+                    in_accounts = False
+                elif header == 'account':
+                    in_transactions = False
+                    in_accounts = True
+                record = {}
+                continue
+            if not in_transactions:
+                if in_accounts and code == 'N' and details is not None:
+                    details['account'] = value
+                continue
+            if code != '^':
+                if not record:
+                    first_line = line_number
+                record.setdefault(code, value)
+                continue
+            if not record:
+                continue
+            date = _qif_date(record.get('D', ''))
+            try:
+                amount = parse_amount(
+                    record.get('T') or record.get('U', '')
+                )
+            except ValueError:
+                date = None
+            if date is None:
+                if errors is not None:
+                    errors.append(first_line)
+            else:
+                yield (
+                    date + ' 00:00', _qif_category(record.get('L')),
+                    record.get('P') or record.get('M') or None, amount
+                )
+            record = {}
+
+
+def _camt_paths(namespace: str) -> dict:
+    """Возвращает пути CAMT_FIELDS с пространством имен выписки."""
+    return {
+        field: [
+            '/'.join(namespace + name for name in path.split('/'))
+            for path in paths
+        ]
+        for field, paths in CAMT_FIELDS.items()
+    }
+
+
+def _camt_field(entry, paths: list):
+    """Возвращает первый непустой текст по одному из путей или None."""
+    for path in paths:
+        text = entry.findtext(path)
+        if text and not text.isspace():
+            return text.strip()
+    return None
+
+
+def _camt_operation(entry, paths: dict, parse_date: DateParser):
+    """Возвращает операцию записи CAMT.053 или None, если дата или
+    сумма не распознаны."""
+    debit = _camt_field(entry, paths['direction']) == 'DBIT'
+    date = _camt_field(entry, paths['date'])
+    date = parse_date(date) if date else None
+    try:
+        amount = parse_amount(_camt_field(entry, paths['amount']) or '')
+    except ValueError:
+        return None
+    if date is None:
+        return None
+    description = (
+        _camt_field(entry, paths['description'])
+        or _camt_field(entry, paths['creditor' if debit else 'debtor'])
+    )
+    return date, None, description, -amount if debit else amount
+
+
+def read_camt_operations(
+    file: io.BufferedIOBase, errors: list = None, details: dict = None
+):
+    """Перебирает проведенные записи выписки CAMT.053 (Ntry).
+
+    XML разбирается iterparse: каждая запись удаляется из дерева сразу
+    после разбора, поэтому размер дерева не зависит от длины выписки.
+    Сумма записи берется целиком, даже если в ней несколько платежей
+    (TxDtls). В errors добавляются порядковые номера пропущенных
+    записей.
+    """
+    parse_date = DateParser()
+    parents = []
+    paths = entry_tag = account_tag = None
+    number = 0
+    try:
+        for event, element in ElementTree.iterparse(
+            file, events=('start', 'end')
+        ):
+            if event == 'start':
+                if paths is None:
+                    namespace, _, name = element.tag.rpartition('}')
+                    if name != 'Document' or 'camt.053' not in namespace:
+                        raise ImportFormatError(
+                            'Файл не является выпиской CAMT.053.'
+                        )
+                    paths = _camt_paths(namespace + '}')
+                    entry_tag = namespace + '}Ntry'
+                    account_tag = namespace + '}Acct'
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag == account_tag and details is not None:
+                details['account'] = (
+                    _camt_field(element, paths['account']) or ''
+                )
+            if element.tag != entry_tag:
+                continue
+            operation = None
+            status = _camt_field(element, paths['status'])
+            if status not in CAMT_PENDING_STATUSES:
+                number += 1
+                operation = _camt_operation(element, paths, parse_date)
+                if operation is None and errors is not None:
+                    errors.append(number)
+            parents[-1].remove(element)
+            element.clear()
+            if operation is not None:
+                yield operation
+    except ElementTree.ParseError as error:
+        raise ImportFormatError(f'Ошибка разбора XML: {error}') from error
+
+
+# Функции чтения по расширению файла. CSV читается отдельно
+# (read_csv_operations), так как для него нужны разделитель и
+# сопоставление столбцов.
+READERS = {
+    'ofx': read_ofx_operations,
+    'qfx': read_ofx_operations,
+    'qif': read_qif_operations,
+    'xml': read_camt_operations,
+}
+CSV_EXTENSIONS = ('csv', 'txt')
+
+
+@contextlib.contextmanager
+def open_operations(
+    path: str, mapping: dict = None, errors: list = None,
+    details: dict = None
+):
+    """Открывает выписку, выбирая формат по расширению файла.
+
+    :param dict mapping: Явные названия столбцов CSV {поле: столбец}
+    :param list errors: Список для номеров пропущенных записей: строк
+        для CSV и QIF, порядковых номеров операций для OFX и CAMT.053
+    :param dict details: Словарь для сведений о выписке (номер счета)
+    :return: (итератор операций, функция текущей позиции в файле в
+        байтах)
+    """
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    if extension in CSV_EXTENSIONS:
+        file, delimiter = open_statement(path)
+        with file:
+            yield (
+                read_csv_operations(file, delimiter, mapping, errors),
+                file.buffer.tell
+            )
+        return
+    reader = READERS.get(extension)
+    if reader is None:
+        raise ImportFormatError(f'Неподдерживаемый формат файла: {extension}')
+    with open(path, 'rb') as file:
+        yield reader(file, errors, details), file.tell
@@ -1,23 +1,28 @@
+import threading
 from typing import TYPE_CHECKING
 
-from PySide6.QtSql import QSqlTableModel
-from PySide6.QtWidgets import (QHBoxLayout, QMainWindow, QVBoxLayout,
-                               QWidget)
+from PySide6.QtCore import QEvent, Qt, QTimer
+from PySide6.QtWidgets import (QApplication, QHBoxLayout, QMainWindow,
+                               QVBoxLayout, QWidget)
 
-from src.categories.categories_controller import CategoriesController
-from src.categories.categories_handler import CategoriesHandler
-from src.categories.categories_view import CategoriesView
+from src.database.worker import DatabaseWorker, TaskProgress
+from src.main_window.main_window_handler import MainWindowHandler
+from src.main_window.operations_table_model import OperationsTableModel
 from src.main_window.main_window_view import CategoryWidget
-from src.operations.operations_controller import OperationsController
 from src.operations.operations_handler import OperationsHandler
-from src.operations.operations_view import OperationsView
 
 if TYPE_CHECKING:
-    from src.main_window.main_window_handler import MainWindowHandler
     from src.main_window.main_window_view import MainWindowView
 
+# Диалоги, импорт и экспорт нужны только по действию пользователя. Их
+# модули (вместе с multiprocessing, XML и ZIP) импортируются при первом
+# использовании, чтобы не задерживать первую отрисовку окна.
+
 
 class MainWindowController(QMainWindow):
+    WORKER_CONNECTION = 'finance_worker'
+    EXPORT_CONNECTION = 'finance_export'
+
     def __init__(self, view: 'MainWindowView', handler: 'MainWindowHandler'):
         super().__init__()
         self.view = view
@@ -33,11 +38,29 @@ class MainWindowController(QMainWindow):
             self.view.year_period_btn: 'current_year',
         }
         self.last_used_category = None
+        self.export_worker = None
 
+        self.initialize_worker()
         self.initialize_operations()
-        self.load_operations()
-        self.reload_data()
+        self.initialize_model()
         self.connect_signals()
+        self.view.installEventFilter(self)
+
+    def eventFilter(self, watched, event) -> bool:
+        """Загружает операции и статистику после первой отрисовки окна.
+
+        Окно показывается с пустой таблицей, а запросы к базе начинаются
+        следующим событием цикла, когда первый кадр уже нарисован.
+        """
+        if watched is self.view and event.type() == QEvent.Paint:
+            self.view.removeEventFilter(self)
+            QTimer.singleShot(0, self.load_initial_data)
+        return super().eventFilter(watched, event)
+
+    def load_initial_data(self) -> None:
+        """Запускает поток базы данных и загружает текущий период."""
+        self.db_worker.start()
+        self.load_operations()
 
     def connect_signals(self) -> None:
         """Подключает сигналы."""
@@ -48,29 +71,110 @@ class MainWindowController(QMainWindow):
         self.view.current_period_btn.clicked.connect(self.set_period)
         self.view.previous_period_btn.clicked.connect(self.set_period)
         self.view.year_period_btn.clicked.connect(self.set_period)
+        self.view.range_apply_btn.clicked.connect(self.set_custom_period)
+        self.view.export_btn.clicked.connect(self.export_operations)
+        self.view.import_btn.clicked.connect(self.import_operations)
+
+    def initialize_worker(self):
+        """Создает поток, который выполняет запросы статистики и записи.
+
+        У потока свое соединение с базой, поэтому интерфейс не ждет
+        агрегирующих запросов и изменений операций. Поток запускается
+        после первой отрисовки окна (load_initial_data), задачи до этого
+        ждут в очереди.
+        """
+        start_day = self.FINANCIAL_MONTH_START_DAY
+        self.db_worker = DatabaseWorker(
+            lambda: MainWindowHandler(self.WORKER_CONNECTION)
+        )
+        self.db_worker.task_failed.connect(self.on_task_failed)
+        self.db_worker.connection_failed.connect(self.on_connection_failed)
+        QApplication.instance().aboutToQuit.connect(self.db_worker.stop)
+        QApplication.instance().aboutToQuit.connect(self.stop_export)
+        self.db_worker.submit(
+            lambda handler: handler.set_financial_month_start_day(start_day)
+        )
+
+    def on_task_failed(self, _, message: str) -> None:
+        """Показывает ошибку, возникшую в потоке базы данных."""
+        self.view.show_message('Ошибка базы данных', message, 'error')
+
+    def on_connection_failed(self, message: str) -> None:
+        """Сообщает, что поток базы данных не смог открыть соединение.
+
+        Статистика и изменения операций в этом случае недоступны.
+        """
+        self.view.show_message('Ошибка базы данных', message, 'error')
 
     def initialize_operations(self):
-        self.operations_view = OperationsView()
+        # Диалог операции создается при первом открытии.
+        self.operations_view = None
         self.operations_handler = OperationsHandler(self.handler)
 
-    def load_operations(self):
-        """Загружает операции из базы данных и отображает их в таблице."""
-        self.handler.fetch_all_operations(self.current_period)
-        self.model = QSqlTableModel(self)
-        self.model.setTable('finances')
+    def initialize_model(self):
+        """Создает модель таблицы операций.
 
-        date_filter = self.handler.get_date_filter(
+        Модель создается один раз, при смене периода у нее меняется
+        только фильтр. Строки читаются страницами по мере прокрутки;
+        первый период загружает load_operations после отрисовки окна.
+        """
+        self.model = OperationsTableModel(self.handler, self)
+        self.view.table_container.horizontalHeader().setSortIndicator(
+            1, Qt.AscendingOrder
+        )
+        self.view.table_container.setModel(self.model)
+        self.view.table_container.hideColumn(0)
+
+    def load_operations(self):
+        """Загружает операции текущего периода и отображает их в таблице."""
+        self.handler.set_period(
             self.current_period, self.FINANCIAL_MONTH_START_DAY
         )
-        if date_filter:
-            self.model.setFilter(date_filter)
+        self.model.set_filter(
+            self.handler.date_filter, self.handler.date_params
+        )
+        self.load_statistics()
+
+    def load_statistics(self):
+        """Запрашивает статистику текущего периода в потоке базы данных.
 
+        Новый запрос вытесняет еще не выполненный предыдущий, поэтому при
+        быстром переключении периодов считается только последний.
+        """
+        period = self.current_period
+        start_day = self.FINANCIAL_MONTH_START_DAY
+
+        def task(handler: MainWindowHandler) -> dict:
+            handler.set_period(period, start_day)
+            handler.load_statistics()
+            return handler.get_category_statistics_detailed()
+
+        self.db_worker.submit(task, self.reload_data, key='statistics')
+
+    def submit_write(self, write) -> None:
+        """Выполняет изменение операций в потоке базы данных.
+
+        Статистика периода обновляется там же по дельте, после чего
+        перечитывается таблица.
+
+        :param write: Функция, принимающая OperationsHandler потока
+        """
+        def task(handler: MainWindowHandler) -> dict:
+            write(OperationsHandler(handler))
+            return handler.get_category_statistics_detailed()
+
+        self.db_worker.submit(task, self.refresh_operations)
+
+    def refresh_operations(self, sorted_data: dict):
+        """Обновляет таблицу и статистику после изменения операций."""
         self.model.select()
-        self.view.table_container.setModel(self.model)
-        self.view.table_container.hideColumn(0)
+        self.reload_data(sorted_data)
 
-    def reload_data(self):
-        sorted_data: dict = self.handler.get_category_statistics_detailed()
+    def reload_data(self, sorted_data: dict):
+        """Отображает статистику периода.
+
+        :param dict sorted_data: Сортированные данные
+        """
         self.view.update_balances(sorted_data)
         self.update_category_widgets(sorted_data)
 
@@ -112,6 +216,13 @@ class MainWindowController(QMainWindow):
             selected_row = selected_index[0].row()
             operation_id = self.model.data(self.model.index(selected_row, 0))
 
+        from src.operations.operations_controller import (
+            OperationsController
+        )
+        from src.operations.operations_view import OperationsView
+
+        if self.operations_view is None:
+            self.operations_view = OperationsView()
         self.operations_controller = OperationsController(
             self.operations_view, self.operations_handler, mode, operation_id
         )
@@ -123,10 +234,27 @@ class MainWindowController(QMainWindow):
         self.operations_controller.last_category.connect(
             self.update_last_category
         )
+        self.operations_controller.operation_saved.connect(
+            self.save_operation
+        )
 
         self.operations_view.exec()
-        self.load_operations()
-        self.reload_data()
+
+    def save_operation(self, operation: dict):
+        """Сохраняет операцию из диалога в потоке базы данных."""
+        values = (
+            operation['date'],
+            operation['category'],
+            operation['description'],
+            operation['balance'],
+        )
+        operation_id = operation['id']
+        if operation_id is None:
+            self.submit_write(lambda handler: handler.add_operation(*values))
+        else:
+            self.submit_write(
+                lambda handler: handler.edit_operation(operation_id, *values)
+            )
 
     def update_last_category(self, category: str):
         """Обновляет последнюю использованную категорию."""
@@ -144,11 +272,17 @@ class MainWindowController(QMainWindow):
             return
         selected_row = selected_index[0].row()
         operation_id = self.model.data(self.model.index(selected_row, 0))
-        self.operations_handler.delete_operation(operation_id)
-        self.load_operations()
-        self.reload_data()
+        self.submit_write(
+            lambda handler: handler.delete_operation(operation_id)
+        )
 
     def open_categories(self):
+        from src.categories.categories_controller import (
+            CategoriesController
+        )
+        from src.categories.categories_handler import CategoriesHandler
+        from src.categories.categories_view import CategoriesView
+
         self.categories_view = CategoriesView()
         self.categories_handler = CategoriesHandler(self.handler)
         self.categories_controller = CategoriesController(
@@ -163,56 +297,157 @@ class MainWindowController(QMainWindow):
         self.categories_view.exec()
 
     def handle_category_deleted(self, category_name: str) -> None:
-        """Обработчик удаления категории"""
-        operations_count = (
-            self.operations_handler.get_operations_count_by_category(
-                category_name
-            )
-        )
-
-        if operations_count > 0:
-            result = self.view.show_question(
-                f'Категория "{category_name}" используется в '
-                f'{operations_count} операциях. При удалении категории '
-                'эти операции будут перемещены в категорию "Другое". '
-                'Продолжить?'
-            )
-            if not result:
-                return
-            if not self.operations_handler.update_operations_category(
-                category_name, 'Другое'
-            ):
-                self.view.show_message(
-                    'Ошибка', 'Ошибка при обновлении операций.', 'error')
-                return
+        """Обработчик удаления категории.
 
+        Операции уже перенесены в "Другое" обработчиком категорий.
+        """
         self.load_operations()
-        self.reload_data()
-        self.update_category_widgets(
-            self.handler.get_category_statistics_detailed()
-        )
 
     def handle_category_updated(self, old_name: str, new_name: str):
-        """Обработчик изменения названия категории"""
-        operations_count = (
-            self.operations_handler.get_operations_count_by_category(old_name)
-        )
-        if operations_count > 0:
-            if not self.operations_handler.update_operations_category(
-                old_name, new_name
-            ):
-                self.view.show_error('Ошибка при обновлении операций.')
-                self.restore_old_name()
-                return
+        """Обработчик изменения названия категории.
 
+        Операции ссылаются на категорию по ID, поэтому достаточно
+        перечитать данные с новым названием.
+        """
         self.load_operations()
-        self.reload_data()
-        self.update_category_widgets(
-            self.handler.get_category_statistics_detailed()
-        )
 
     def set_period(self):
         sender = self.sender()
         self.current_period = self.config_period[sender]
         self.load_operations()
-        self.reload_data()
+
+    def set_custom_period(self):
+        """Показывает операции и статистику за выбранный диапазон дат."""
+        start_date, end_date = self.view.get_custom_range()
+        if start_date > end_date:
+            self.view.show_message(
+                'Ошибка',
+                'Начало диапазона позже его конца.',
+                'error'
+            )
+            return
+        self.view.clear_period_buttons()
+        self.current_period = (start_date, end_date)
+        self.load_operations()
+
+    def export_operations(self):
+        """Экспортирует операции текущего периода в CSV или XLSX.
+
+        Файл пишется в отдельном потоке, окно прогресса позволяет
+        отменить экспорт.
+        """
+        if self.export_worker and self.export_worker.isRunning():
+            self.view.show_message(
+                'Экспорт', 'Экспорт уже выполняется.', 'warning'
+            )
+            return
+        path = self.view.get_export_path()
+        if not path:
+            return
+
+        from src.export.export_worker import ExportWorker
+
+        self.export_worker = ExportWorker(
+            lambda: MainWindowHandler(self.EXPORT_CONNECTION),
+            path,
+            self.handler.date_range,
+            parent=self
+        )
+        dialog = self.view.create_progress_dialog('Экспорт операций')
+        dialog.canceled.connect(self.export_worker.cancel)
+        self.export_worker.progress.connect(
+            lambda written, total: self.update_progress(dialog, written, total)
+        )
+        self.export_worker.export_finished.connect(
+            lambda count: self.view.show_message(
+                'Экспорт', f'Экспортировано операций: {count}.'
+            )
+        )
+        self.export_worker.export_failed.connect(
+            lambda message: self.view.show_message(
+                'Ошибка экспорта', message, 'error'
+            )
+        )
+        self.export_worker.finished.connect(dialog.reset)
+        self.export_worker.start()
+
+    def import_operations(self):
+        """Импортирует операции из выписок банка (CSV, OFX, QIF или
+        CAMT.053).
+
+        Импорт выполняется в потоке базы данных, как и остальные записи,
+        одной транзакцией; несколько файлов разбираются параллельно.
+        Окно прогресса позволяет его отменить, тогда ни одна операция
+        не сохраняется.
+        """
+        paths = self.view.get_import_paths()
+        if not paths:
+            return
+
+        from src.imports.import_handler import ImportCancelled, ImportHandler
+        from src.imports.import_parsers import ImportFormatError
+
+        progress = TaskProgress(self)
+        cancel_event = threading.Event()
+        dialog = self.view.create_progress_dialog('Импорт операций')
+        dialog.canceled.connect(cancel_event.set)
+        progress.changed.connect(
+            lambda done, total: self.update_progress(dialog, done, total)
+        )
+
+        def task(handler: MainWindowHandler) -> dict:
+            try:
+                return ImportHandler(handler).import_files(
+                    paths,
+                    progress=progress.changed.emit,
+                    is_cancelled=cancel_event.is_set
+                )
+            except ImportCancelled:
+                return {'cancelled': True}
+            except (ImportFormatError, OSError) as error:
+                return {'error': str(error)}
+            except Exception as error:
+                # Например, BrokenProcessPool, если процесс разбора упал:
+                # окно прогресса все равно должно закрыться.
+                print('Ошибка импорта:', error)
+                return {'error': str(error) or type(error).__name__}
+
+        def finish(result: dict) -> None:
+            dialog.reset()
+            self.on_import_finished(result)
+
+        self.db_worker.submit(task, finish)
+
+    def on_import_finished(self, result: dict) -> None:
+        """Показывает итог импорта и перечитывает данные."""
+        if 'error' in result:
+            self.view.show_message(
+                'Ошибка импорта', result['error'], 'error'
+            )
+            return
+        if result.get('cancelled'):
+            return
+        message = f'Импортировано операций: {result["imported"]}.'
+        if result['duplicates']:
+            message += (
+                f'\nУже были импортированы: {result["duplicates"]}.'
+            )
+        if result['skipped']:
+            name, number = result['skipped'][0]
+            message += (
+                f'\nПропущено записей: {len(result["skipped"])} '
+                f'(первая — {name}, №{number}).'
+            )
+        self.view.show_message('Импорт', message)
+        self.load_operations()
+
+    def update_progress(self, dialog, done: int, total: int) -> None:
+        """Показывает прогресс длительной операции."""
+        dialog.setMaximum(total)
+        dialog.setValue(done)
+
+    def stop_export(self) -> None:
+        """Отменяет экспорт и дожидается завершения потока."""
+        if self.export_worker and self.export_worker.isRunning():
+            self.export_worker.cancel()
+            self.export_worker.wait()
@@ -2,13 +2,16 @@ import ctypes
 import math
 import os
 
-from PySide6.QtCore import QLocale, QPointF, QRectF, Qt
+from PySide6.QtCore import QDate, QLocale, QPointF, QRectF, Qt
 from PySide6.QtGui import (QBrush, QColor, QFont, QIcon, QPainter, QPen,
                            QPixmap, QRadialGradient)
-from PySide6.QtWidgets import (QApplication, QFrame, QHBoxLayout, QHeaderView,
-                               QLabel, QLayout, QMainWindow, QMessageBox,
-                               QStyledItemDelegate, QVBoxLayout, QWidget)
+from PySide6.QtWidgets import (QApplication, QDateEdit, QFileDialog, QFrame,
+                               QHBoxLayout, QHeaderView, QLabel, QLayout,
+                               QMainWindow, QMessageBox, QProgressDialog,
+                               QPushButton, QStyledItemDelegate, QVBoxLayout,
+                               QWidget)
 
+from src.core.money import format_amount, whole_rubles
 from src.main_window.ui.main_window_ui import Ui_MainWindow
 
 
@@ -19,6 +22,8 @@ class MainWindowView(QMainWindow, Ui_MainWindow):
         self.current_selected = 'outcome'
 
         self.income_frame.hide()
+        self.setup_range_picker()
+        self.setup_file_buttons()
         self.setup_style()
         self.connect_signals()
         self.update_total_balance_styles()
@@ -85,6 +90,83 @@ class MainWindowView(QMainWindow, Ui_MainWindow):
             }
         ''')
 
+    def setup_range_picker(self):
+        """Добавляет под кнопками периодов выбор произвольного диапазона."""
+        today = QDate.currentDate()
+        self.range_start_edit = QDateEdit(today.addMonths(-1))
+        self.range_end_edit = QDateEdit(today)
+        for date_edit in (self.range_start_edit, self.range_end_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat('dd.MM.yyyy')
+        self.range_apply_btn = QPushButton('Показать')
+        self.range_apply_btn.setStyleSheet(
+            self.current_period_btn.styleSheet()
+        )
+
+        range_layout = QHBoxLayout()
+        range_layout.setSpacing(6)
+        range_layout.addWidget(self.range_start_edit)
+        range_layout.addWidget(self.range_end_edit)
+        range_layout.addWidget(self.range_apply_btn)
+        self.verticalLayout.insertLayout(1, range_layout)
+
+    def setup_file_buttons(self):
+        """Добавляет кнопки работы с файлами рядом с кнопками операций."""
+        self.export_btn = QPushButton('Экспорт', self.main_widget)
+        self.export_btn.setStyleSheet(self.new_btn.styleSheet())
+        self.buttons_container.addWidget(self.export_btn)
+        self.import_btn = QPushButton('Импорт', self.main_widget)
+        self.import_btn.setStyleSheet(self.new_btn.styleSheet())
+        self.buttons_container.addWidget(self.import_btn)
+
+    def get_export_path(self) -> str:
+        """Спрашивает файл для экспорта. Пустая строка — отказ."""
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            'Экспорт операций',
+            'operations.csv',
+            'CSV (*.csv);;Excel (*.xlsx)'
+        )
+        return path
+
+    def get_import_paths(self) -> list:
+        """Спрашивает файлы выписок для импорта. Пустой список — отказ."""
+        paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            'Импорт операций',
+            '',
+            'Выписки (*.csv *.txt *.ofx *.qfx *.qif *.xml);;'
+            'CSV (*.csv *.txt);;OFX (*.ofx *.qfx);;QIF (*.qif);;'
+            'CAMT.053 (*.xml)'
+        )
+        return paths
+
+    def create_progress_dialog(self, title: str) -> QProgressDialog:
+        """Создает окно прогресса с кнопкой отмены."""
+        dialog = QProgressDialog(title, 'Отмена', 0, 0, self)
+        dialog.setWindowTitle(title)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(500)
+        return dialog
+
+    def get_custom_range(self) -> tuple:
+        """Возвращает выбранный диапазон (начало, конец) из дат."""
+        return (
+            self.range_start_edit.date().toPython(),
+            self.range_end_edit.date().toPython()
+        )
+
+    def clear_period_buttons(self) -> None:
+        """Снимает выбор с кнопок периодов при выборе диапазона."""
+        for button in (
+            self.current_period_btn,
+            self.previous_period_btn,
+            self.year_period_btn
+        ):
+            button.setAutoExclusive(False)
+            button.setChecked(False)
+            button.setAutoExclusive(True)
+
     def set_icon(self, app: QApplication) -> None:
         """Установка иконки.
 
@@ -140,9 +222,13 @@ class MainWindowView(QMainWindow, Ui_MainWindow):
         """
         total_income = sorted_data['income']['total']
         total_outcome = sorted_data['outcome']['total']
-        self.balance_lbl.setText(str(int(total_income + total_outcome)) + ' ₽')
-        self.income_balance_lbl.setText(str(int(total_income)) + ' ₽')
-        self.outcome_balance_lbl.setText(str(int(total_outcome)) + ' ₽')
+        self.balance_lbl.setText(
+            str(whole_rubles(total_income + total_outcome)) + ' ₽'
+        )
+        self.income_balance_lbl.setText(str(whole_rubles(total_income)) + ' ₽')
+        self.outcome_balance_lbl.setText(
+            str(whole_rubles(total_outcome)) + ' ₽'
+        )
 
     def select_widget(self, widget_type: str):
         self.current_selected = widget_type
@@ -278,16 +364,10 @@ class NumberFormatDelegate(QStyledItemDelegate):
         super().__init__(parent)
 
     def displayText(self, value, locale):
-        """Форматируем числовые значения с точкой в качестве разделителя."""
-        try:
-            str_value = str(value).replace(',', '.')
-            num_value = float(str_value)
-
-            if num_value.is_integer():
-                return str(int(num_value))
-            return str_value
-        except (ValueError, TypeError):
-            return str(value)
+        """Форматируем сумму в копейках как рубли с точкой."""
+        if isinstance(value, int):
+            return format_amount(value)
+        return str(value)
 
     def initStyleOption(self, option, index):
         """Добавляем выравнивание по центру."""
@@ -336,7 +416,7 @@ class CategoryWidget(QWidget):
         self.name_label.setMinimumSize(100, 24)
         self.name_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
 
-        self.amount_label = QLabel(str(int(self.amount)) + ' ₽')
+        self.amount_label = QLabel(str(whole_rubles(self.amount)) + ' ₽')
         self.amount_label.setMinimumSize(80, 24)
         self.amount_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
 
@@ -661,4 +741,6 @@ class PieChartDrawingWidget(QWidget):
         font.setBold(True)
         painter.setFont(font)
         painter.setPen(QPen(QColor('#c8fafa')))
-        painter.drawText(rect, Qt.AlignCenter, f'{int(self.total_amount)} ₽')
+        painter.drawText(
+            rect, Qt.AlignCenter, f'{whole_rubles(self.total_amount)} ₽'
+        )
@@ -0,0 +1,207 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class OperationsTableModel(QAbstractTableModel):
+    """Модель таблицы операций, читающая строки страницами.
+
+    Страницы загружаются keyset-пагинацией по (столбец сортировки, ID):
+    для соседней страницы достаточно условия "после последней строки
+    предыдущей", поэтому прокрутка не использует OFFSET по всей выборке.
+    В памяти держится не больше MAX_PAGES страниц, давно не
+    использованные вытесняются. Сортировка выполняется в ORDER BY.
+
+    Для категории, описания и суммы есть индексы порядка (миграция 10).
+    Если под фильтр попадает много строк, страница читается по такому
+    индексу и сортировать всю выборку не нужно. Небольшую выборку
+    быстрее найти по индексу дат и отсортировать.
+    """
+
+    PAGE_SIZE = 200
+    MAX_PAGES = 8
+    INDEX_ORDER_MIN_ROWS = 10000
+    HEADERS = ['ID', 'Date', 'Category', 'Description', 'Balance']
+    SORT_COLUMNS = [
+        'f.ID',
+        'f.Date',
+        "IFNULL(c.Name, '')",
+        "IFNULL(f.Description, '')",
+        'f.Balance',
+    ]
+    SORT_INDEXES = [
+        None,
+        None,
+        'idx_finances_sort_category',
+        'idx_finances_sort_description',
+        'idx_finances_sort_balance',
+    ]
+    CATEGORY_COLUMN = 2
+
+    def __init__(self, db_handler, parent=None):
+        super().__init__(parent)
+        self.db_handler = db_handler
+        self.where = '1=1'
+        self.params = []
+        self.sort_column = 1
+        self.sort_order = Qt.AscendingOrder
+        self.row_count = 0
+        self.pages = OrderedDict()
+        # Ключ последней строки страницы page - 1 для каждой известной
+        # границы: строки страницы page идут сразу после него.
+        self.page_starts = {0: None}
+
+    def set_filter(self, where: str, params=None) -> None:
+        """Задает условие WHERE и перечитывает таблицу."""
+        self.where = where
+        self.params = list(params or [])
+        self.select()
+
+    def select(self) -> None:
+        """Сбрасывает загруженные страницы и пересчитывает число строк."""
+        self.beginResetModel()
+        self.pages.clear()
+        self.page_starts = {0: None}
+        query = self.db_handler.execute_query(
+            f'SELECT COUNT(*) FROM finances f WHERE {self.where}',
+            self.params
+        )
+        self.row_count = query.value(0) if query.next() else 0
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        page, offset = divmod(index.row(), self.PAGE_SIZE)
+        rows = self._get_page(page)
+        if offset >= len(rows):
+            return None
+        return rows[offset][index.column()]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.select()
+
+    def _get_page(self, page: int) -> list:
+        if page in self.pages:
+            self.pages.move_to_end(page)
+            return self.pages[page]
+
+        rows = self._fetch_page(page)
+        self.pages[page] = rows
+        if len(self.pages) > self.MAX_PAGES:
+            self.pages.popitem(last=False)
+        return rows
+
+    def _fetch_page(self, page: int) -> list:
+        """Читает страницу от ближайшей известной границы.
+
+        При последовательной прокрутке граница страницы уже известна,
+        и OFFSET равен нулю. При переходе далеко вперед пропускаются
+        только страницы между известной границей и нужной.
+        """
+        known_page = max(p for p in self.page_starts if p <= page)
+        start_key = self.page_starts[known_page]
+
+        descending = self.sort_order == Qt.DescendingOrder
+        index = None
+        if self.row_count >= self.INDEX_ORDER_MIN_ROWS:
+            index = self.SORT_INDEXES[self.sort_column]
+        if index is not None and self.sort_column == self.CATEGORY_COLUMN:
+            sql, params = self._category_page_query(descending, start_key)
+        else:
+            sql, params = self._page_query(descending, start_key, index)
+        params.extend([
+            self.PAGE_SIZE, (page - known_page) * self.PAGE_SIZE
+        ])
+
+        query = self.db_handler.execute_query(sql, params)
+        rows = []
+        last_key = None
+        while query.next():
+            rows.append(tuple(query.value(i) for i in range(5)))
+            last_key = (query.value(5), query.value(0))
+
+        if len(rows) == self.PAGE_SIZE:
+            self.page_starts[page + 1] = last_key
+        return rows
+
+    def _page_query(
+        self, descending: bool, start_key, index: str = None
+    ) -> tuple:
+        """Запрос страницы после строки start_key.
+
+        :param str index: Индекс порядка, по которому читать строки
+        """
+        sort_expr = self.SORT_COLUMNS[self.sort_column]
+        direction = 'DESC' if descending else 'ASC'
+        conditions = [f'({self.where})']
+        params = list(self.params)
+        if start_key is not None:
+            # Условие на один sort_expr SQLite ищет по индексу, а
+            # сравнение пар лишь отсекает строки с тем же ключом.
+            conditions.append(
+                f"{sort_expr} {'<=' if descending else '>='} ? AND "
+                f"({sort_expr}, f.ID) {'<' if descending else '>'} (?, ?)"
+            )
+            params.extend([start_key[0], *start_key])
+        indexed_by = f'INDEXED BY {index}' if index else ''
+        sql = f'''
+            SELECT f.ID, f.Date, c.Name, f.Description, f.Balance,
+                   {sort_expr}
+            FROM finances f {indexed_by}
+            LEFT JOIN categories c ON c.ID = f.CategoryID
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {sort_expr} {direction}, f.ID {direction}
+            LIMIT ? OFFSET ?
+            '''
+        return sql, params
+
+    def _category_page_query(self, descending: bool, start_key) -> tuple:
+        """Запрос страницы по категории после строки start_key.
+
+        Категории перебираются по индексу названий, операции каждой
+        категории — по индексу CategoryID, то есть уже по ID. Операции
+        без категории (ключ '') читаются отдельной частью UNION ALL,
+        SQLite сливает обе части без общей сортировки.
+        """
+        direction = 'DESC' if descending else 'ASC'
+        after = '<' if descending else '>'
+        uncategorized = [f'({self.where})', 'f.CategoryID IS NULL']
+        categorized = [f'({self.where})']
+        uncategorized_params = list(self.params)
+        categorized_params = list(self.params)
+        if start_key is not None:
+            uncategorized.append(f"('', f.ID) {after} (?, ?)")
+            uncategorized_params.extend(start_key)
+            categorized.append(
+                f"c.Name {after}= ? AND (c.Name, f.ID) {after} (?, ?)"
+            )
+            categorized_params.extend([start_key[0], *start_key])
+        sql = f'''
+            SELECT f.ID, f.Date, NULL, f.Description, f.Balance, '', 0
+            FROM finances f INDEXED BY idx_finances_sort_category
+            WHERE {' AND '.join(uncategorized)}
+            UNION ALL
+            SELECT f.ID, f.Date, c.Name, f.Description, f.Balance,
+                   c.Name, c.ID
+            FROM categories c
+            CROSS JOIN finances f INDEXED BY idx_finances_sort_category
+                ON f.CategoryID = c.ID
+            WHERE {' AND '.join(categorized)}
+            ORDER BY 6 {direction}, 7 {direction}, 1 {direction}
+            LIMIT ? OFFSET ?
+            '''
+        return sql, uncategorized_params + categorized_params
@@ -3,6 +3,8 @@ from typing import TYPE_CHECKING
 from PySide6.QtCore import QDateTime, Signal
 from PySide6.QtWidgets import QDialog
 
+from src.core.money import format_amount, to_minor_units
+
 if TYPE_CHECKING:
     from src.operations.operations_handler import OperationsHandler
     from src.operations.operations_view import OperationsView
@@ -10,6 +12,7 @@ if TYPE_CHECKING:
 
 class OperationsController(QDialog):
     last_category = Signal(str)
+    operation_saved = Signal(dict)
 
     def __init__(
         self,
@@ -56,22 +59,25 @@ class OperationsController(QDialog):
             self.view.date.setDateTime(date_time)
             self.view.category_cb.setCurrentText(operation_data['category'])
             self.view.description_le.setText(operation_data['description'])
-            self.view.amount_le.setText(str(operation_data['balance']))
+            self.view.amount_le.setText(
+                format_amount(operation_data['balance'])
+            )
 
     def save_operation(self):
-        """Сохраняет новую или отредактированную операцию."""
+        """Передает новую или отредактированную операцию на сохранение."""
         if not self.validate_form():
             return
         date = self.view.date.text()
         category = self.view.category_cb.currentText()
         description = self.view.description_le.text()
-        balance = self.view.amount_le.text().replace(',', '.')
-        if self.mode == 'new':
-            self.handler.add_operation(date, category, description, balance)
-        else:
-            self.handler.edit_operation(
-                self.operation_id, date, category, description, balance
-            )
+        balance = to_minor_units(self.view.amount_le.text())
+        self.operation_saved.emit({
+            'id': self.operation_id if self.mode == 'edit' else None,
+            'date': date,
+            'category': category,
+            'description': description,
+            'balance': balance,
+        })
         self.last_category.emit(category)
 
         self.view.accept()
@@ -92,5 +98,12 @@ class OperationsController(QDialog):
                 "error"
             )
             return False
+        elif not self.view.amount_le.hasAcceptableInput():
+            self.view.show_message(
+                "Ошибка",
+                "Введите корректную сумму",
+                "error"
+            )
+            return False
         else:
             return True
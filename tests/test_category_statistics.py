@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from src.core.database import SqliteDatabase
+from src.core.ledger import Ledger
+from src.core.periods import parse_date
+from src.core.repositories import CategoryRepository, OperationRepository
+
+
+class CategoryStatisticsTest(unittest.TestCase):
+    """Статистика по итогам за дни после изменения категорий."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.ledger = Ledger(
+            SqliteDatabase(os.path.join(directory.name, 'finance_db.db'))
+        )
+        self.assertTrue(self.ledger.initialize_database())
+        self.addCleanup(self.ledger.close)
+        self.categories = CategoryRepository(self.ledger)
+        self.categories.add_category('Кофе')
+        operations = OperationRepository(self.ledger)
+        operations.add_operation('2026-02-10 09:00', 'Кофе', '', -25000)
+        operations.add_operation('2026-02-11 09:00', 'Другое', '', -1000)
+        # Период не из целых месяцев считается по итогам за дни.
+        self.ledger.set_period(
+            (parse_date('2026-02-03'), parse_date('2026-03-02')), 1
+        )
+        self.assertEqual(
+            self.outcome_sums(), {'Кофе': -25000, 'Другое': -1000}
+        )
+
+    def outcome_sums(self) -> dict:
+        self.ledger.load_statistics()
+        statistics = self.ledger.get_category_statistics_detailed()
+        return {
+            name: item['sum']
+            for name, item in statistics['outcome']['categories'].items()
+        }
+
+    def test_rename_category(self):
+        self.assertTrue(self.categories.update_category('Кофе', 'Чай'))
+        self.assertEqual(
+            self.outcome_sums(), {'Чай': -25000, 'Другое': -1000}
+        )
+
+    def test_delete_category(self):
+        self.assertTrue(self.categories.delete_category('Кофе'))
+        self.assertEqual(self.outcome_sums(), {'Другое': -26000})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from src.cli.commands import main
+
+
+class OpenPeriodTest(unittest.TestCase):
+    """Период только с --from или только с --to."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.database = os.path.join(self.directory, 'finance_db.db')
+        self.run_command('add', '2025-06-01', '-100', 'Другое', 'Кофе')
+        self.run_command('add', '2026-06-01', '200', 'Другое', 'Возврат')
+
+    def run_command(self, *argv) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = main(['--database', self.database, *argv])
+        self.assertEqual(code, 0)
+        return output.getvalue()
+
+    def stats(self, *argv) -> tuple:
+        statistics = json.loads(self.run_command('stats', '--json', *argv))
+        return statistics['income']['total'], statistics['outcome']['total']
+
+    def exported_amounts(self, *argv) -> list:
+        path = os.path.join(self.directory, 'export.csv')
+        self.run_command('export', path, *argv)
+        with open(path, encoding='utf-8-sig', newline='') as file:
+            rows = list(csv.reader(file, delimiter=';'))
+        return [row[-1] for row in rows[1:]]
+
+    def test_only_to(self):
+        self.assertEqual(self.stats('--to', '2026-01-01'), (0, -10000))
+        # Конец периода совпадает с концом месяца: суммы из итогов.
+        self.assertEqual(self.stats('--to', '31.12.2025'), (0, -10000))
+        self.assertEqual(
+            self.exported_amounts('--to', '2026-01-01'), ['-100']
+        )
+
+    def test_only_from(self):
+        self.assertEqual(self.stats('--from', '2026-01-01'), (20000, 0))
+        self.assertEqual(
+            self.exported_amounts('--from', '01.01.2026'), ['200']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import tracemalloc
+import unittest
+
+from src.imports.import_pipeline import ROW_VALUES, flat_batches
+
+# Запуск из корня проекта: python -m unittest discover tests
+
+
+def _hashes(operations) -> list:
+    """Возвращает отпечатки операций в порядке выписки."""
+    values = [
+        value
+        for batch in flat_batches(operations, {'Продукты': 1}, 2, 250)
+        for value in batch
+    ]
+    return values[ROW_VALUES - 1::ROW_VALUES]
+
+
+class FlatBatchesTest(unittest.TestCase):
+
+    def test_unsorted_repeats_get_distinct_hashes(self):
+        coffee = ('2026-01-05 00:00', 'Продукты', 'Кофе', -25000)
+        operations = [
+            coffee,
+            ('2026-01-06 00:00', 'Продукты', 'Хлеб', -6000),
+            coffee,
+        ]
+        hashes = _hashes(operations)
+        self.assertEqual(len(hashes), 3)
+        self.assertEqual(len(set(hashes)), 3)
+
+    def test_hashes_do_not_depend_on_order_of_days(self):
+        coffee = ('2026-01-05 00:00', 'Продукты', 'Кофе', -25000)
+        bread = ('2026-01-06 00:00', 'Продукты', 'Хлеб', -6000)
+        self.assertEqual(
+            set(_hashes([coffee, coffee, bread])),
+            set(_hashes([coffee, bread, coffee]))
+        )
+
+    def test_repeat_counter_memory_is_bounded(self):
+        rows = 20000
+        operations = (
+            (
+                f'2026-01-{index % 28 + 1:02d} 00:00', 'Продукты',
+                f'Оплата покупки в магазине номер {index}', -index
+            )
+            for index in range(rows)
+        )
+        tracemalloc.start()
+        try:
+            for _ in flat_batches(operations, {'Продукты': 1}, 2, 250):
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak / rows, 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import io
+import unittest
+
+from src.core.money import to_minor_units
+from src.imports.import_parsers import parse_amount, read_csv_operations
+
+
+class ToMinorUnitsTest(unittest.TestCase):
+
+    def test_amounts(self):
+        self.assertEqual(to_minor_units('-1500,5'), -150050)
+        self.assertEqual(to_minor_units('1.5e2'), 15000)
+
+    def test_not_finite_amounts_are_rejected(self):
+        for value in ['inf', '-Infinity', 'nan', 'sNaN', '1e999']:
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    to_minor_units(value)
+
+    def test_amount_must_fit_integer_column(self):
+        with self.assertRaises(ValueError):
+            to_minor_units('99999999999999999')
+
+
+class ParseAmountTest(unittest.TestCase):
+
+    def test_amounts(self):
+        self.assertEqual(parse_amount('1 234,56'), 123456)
+        self.assertEqual(parse_amount('1,234.5'), 123450)
+        self.assertEqual(parse_amount('-12.3400'), -1234)
+
+    def test_three_fraction_digits_are_rejected(self):
+        for value in ['1,234', '12.345']:
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_amount(value)
+
+
+class CsvAmountTest(unittest.TestCase):
+
+    def test_not_finite_amount_skips_row(self):
+        file = io.StringIO(
+            'Дата;Сумма\n'
+            '05.01.2026;inf\n'
+            '06.01.2026;nan\n'
+            '07.01.2026;1e999\n'
+            '08.01.2026;-60,00\n'
+        )
+        errors = []
+        operations = list(read_csv_operations(file, errors=errors))
+        self.assertEqual(
+            operations, [('2026-01-08 00:00', None, None, -6000)]
+        )
+        self.assertEqual(errors, [2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()